@@ -1,10 +1,12 @@
 from django.contrib import admin
+from audit.engine import AuditedAdminMixin
+from rjbcl.admin_export import ExportMixin
 from django.utils.html import format_html
 from .models import ITAsset
 
 
 @admin.register(ITAsset)
-class ITAssetAdmin(admin.ModelAdmin):
+class ITAssetAdmin(AuditedAdminMixin, ExportMixin, admin.ModelAdmin):
     list_display = (
         'asset_tag',
         'name_display',
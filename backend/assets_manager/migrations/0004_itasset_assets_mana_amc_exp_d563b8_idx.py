@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets_manager', '0003_itasset_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itasset',
+            index=models.Index(fields=['amc_expiry_date'], name='assets_mana_amc_exp_d563b8_idx'),
+        ),
+    ]
@@ -94,6 +94,11 @@ class ITAsset(models.Model):
     # Technical Specs (JSON for flexibility)
     specs = HTMLField(blank=True, help_text="RAM, Storage, IP Address, etc.")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['amc_expiry_date']),
+        ]
+
     def save(self, *args, **kwargs):
         # Auto-calculate Risk per IS Audit Guidelines
         # Risk Score = C + I + A (Max 9)
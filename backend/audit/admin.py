@@ -0,0 +1,52 @@
+from django.contrib import admin
+from django.utils.html import format_html_join
+
+from rjbcl.admin_bigtable import BigTableMixin
+from rjbcl.admin_export import ExportMixin
+from .models import ArchiveSegment, AuditEntry
+
+
+@admin.register(AuditEntry)
+class AuditEntryAdmin(ExportMixin, BigTableMixin, admin.ModelAdmin):
+    """Read-only view of the audit trail"""
+
+    list_display = ('changed_at', 'content_type', 'object_id', 'object_repr', 'action', 'changed_by', 'change_summary')
+    list_filter = ('action', 'content_type', 'changed_at')
+    search_fields = ('object_id', 'object_repr', 'changed_by__email')
+    list_select_related = ('content_type', 'changed_by')
+    date_hierarchy = 'changed_at'
+
+    def change_summary(self, obj):
+        if obj.action == 'DELETE':
+            return "Deleted, last values kept"
+        return format_html_join(
+            ', ', '<b>{}</b>: {} &rarr; {}', ((name, old, new) for name, (old, new) in obj.changes.items())
+        )
+
+    change_summary.short_description = "Changes"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchiveSegment)
+class ArchiveSegmentAdmin(admin.ModelAdmin):
+    """Files written by the archive_history command"""
+
+    list_display = ('source', 'month', 'row_count', 'first_pk', 'last_pk', 'path', 'created_at')
+    list_filter = ('source', 'month')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
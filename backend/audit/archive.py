@@ -0,0 +1,172 @@
+"""
+Cold archive for history tables that only ever grow.
+
+archive_history moves rows older than the retention horizon into gzip NDJSON files
+under settings.ARCHIVE_ROOT, one file per source, month and chunk:
+
+    archive/history/2024/03/1001-1999.ndjson.gz
+
+Every chunk is written and fsynced before its rows are deleted, in one transaction
+with its ArchiveSegment rows, so an interrupted run loses nothing and the next run
+picks up where it stopped. A chunk that was written but not deleted is selected again
+with the same primary keys and overwrites its own files.
+
+The lookup functions read archived rows back as unsaved model instances.
+"""
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchiveSegment
+
+ARCHIVE_CHUNK_SIZE = 5000
+
+
+class ArchiveSource:
+    """
+    One archivable table: `date_field` decides the age of a row, `key_field` is the
+    numeric key lookups search by (bounded per segment), `key` builds that lookup key.
+    """
+
+    def __init__(self, name, model, date_field, key_field=None, key=None):
+        self.name = name
+        self.model_label = model
+        self.date_field = date_field
+        self.key_field = key_field
+        self._key = key or (lambda row: row[key_field])
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def fields(self):
+        return [field.attname for field in self.model._meta.concrete_fields]
+
+    def key(self, row):
+        return self._key(row)
+
+
+def _object_key(row):
+    return row['content_type_id'], str(row['object_id'])
+
+
+ARCHIVE_SOURCES = {
+    source.name: source for source in (
+        ArchiveSource('history', 'statement_tracker.BankStatementChangeHistory', 'changed_at', key_field='bank_statement_id'),
+        ArchiveSource('logentry', 'admin.LogEntry', 'action_time', key=_object_key),
+        ArchiveSource('audit', 'audit.AuditEntry', 'changed_at', key=_object_key),
+    )
+}
+
+
+def archive_root():
+    return Path(settings.ARCHIVE_ROOT)
+
+
+def retention_cutoff(days=None):
+    """Rows older than this are archived"""
+    return timezone.now() - timedelta(days=settings.HISTORY_RETENTION_DAYS if days is None else days)
+
+
+def _month(value):
+    """First day of the month of a date or datetime"""
+    if isinstance(value, datetime):
+        value = (timezone.localtime(value) if timezone.is_aware(value) else value).date()
+    return value.replace(day=1)
+
+
+def _write_segment(source, month, rows):
+    pk = source.model._meta.pk.attname
+    path = Path(source.name, f"{month:%Y}", f"{month:%m}", f"{rows[0][pk]}-{rows[-1][pk]}.ndjson.gz")
+    target = archive_root() / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + '.part')
+    with open(partial, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as file:
+            for row in rows:
+                file.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8') + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, target)
+
+    keys = [row[source.key_field] for row in rows if source.key_field and row[source.key_field] is not None]
+    return ArchiveSegment(
+        source=source.name, month=month, path=path.as_posix(),
+        first_pk=rows[0][pk], last_pk=rows[-1][pk], row_count=len(rows),
+        key_min=min(keys) if keys else None, key_max=max(keys) if keys else None,
+    )
+
+
+def archive_chunk(source, cutoff, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """Archive the oldest `chunk_size` rows of `source` older than `cutoff`, returns how many moved"""
+    model = source.model
+    pk = model._meta.pk.attname
+    older = model._base_manager.filter(**{f'{source.date_field}__lt': cutoff})
+    rows = list(older.order_by(pk).values(*source.fields)[:chunk_size])
+    if not rows:
+        return 0
+
+    by_month = defaultdict(list)
+    for row in rows:
+        by_month[_month(row[source.date_field])].append(row)
+    segments = [_write_segment(source, month, month_rows) for month, month_rows in sorted(by_month.items())]
+
+    with transaction.atomic():
+        for segment in segments:
+            ArchiveSegment.objects.filter(path=segment.path).delete()
+        ArchiveSegment.objects.bulk_create(segments)
+        # Every row older than the cutoff up to the last pk was in this chunk
+        older.filter(**{f'{pk}__lte': rows[-1][pk]}).delete()
+    return len(rows)
+
+
+def archived_rows(source_name, key, since=None):
+    """
+    Archived rows of `source_name` whose lookup key equals `key`, newest first, as unsaved
+    model instances. `since` skips months before that date.
+    """
+    source = ARCHIVE_SOURCES[source_name]
+    model = source.model
+    pk = model._meta.pk.attname
+    segments = ArchiveSegment.objects.filter(source=source_name)
+    if since is not None:
+        segments = segments.filter(month__gte=_month(since))
+    if source.key_field:
+        segments = segments.filter(key_min__lte=key, key_max__gte=key)
+
+    fields = model._meta.concrete_fields
+    found = {}
+    for segment in segments:
+        with gzip.open(archive_root() / segment.path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                row = json.loads(line)
+                # A chunk archived twice after an interruption may appear in two files
+                if source.key(row) == key and row[pk] not in found:
+                    found[row[pk]] = model(**{field.attname: field.to_python(row[field.attname]) for field in fields})
+    return sorted(found.values(), key=lambda obj: getattr(obj, source.date_field), reverse=True)
+
+
+def archived_statement_history(statement):
+    """Archived BankStatementChangeHistory rows of a bank statement"""
+    return archived_rows('history', statement.pk, since=statement.created_date)
+
+
+def archived_log_entries(obj):
+    """Archived admin LogEntry rows of any object"""
+    return archived_rows('logentry', (ContentType.objects.get_for_model(obj).pk, str(obj.pk)))
+
+
+def archived_audit_entries(obj):
+    """Archived AuditEntry rows of any object"""
+    return archived_rows('audit', (ContentType.objects.get_for_model(obj).pk, str(obj.pk)))
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from audit.archive import ARCHIVE_CHUNK_SIZE, ARCHIVE_SOURCES, archive_chunk, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move change history and admin log entries older than the retention horizon "
+        "into gzip NDJSON files under ARCHIVE_ROOT. Safe to interrupt and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=None,
+                            help=f"Age in days, default HISTORY_RETENTION_DAYS ({settings.HISTORY_RETENTION_DAYS})")
+        parser.add_argument('--source', action='append', choices=sorted(ARCHIVE_SOURCES),
+                            help="Only archive this source, can be repeated. Default: all")
+        parser.add_argument('--chunk-size', type=int, default=ARCHIVE_CHUNK_SIZE, help="Rows moved per transaction")
+        parser.add_argument('--max-chunks', type=int, help="Stop after this many chunks per source")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would be archived")
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['older_than'])
+        self.stdout.write(f"Archiving rows older than {cutoff:%Y-%m-%d %H:%M}")
+        for name in options['source'] or ARCHIVE_SOURCES:
+            source = ARCHIVE_SOURCES[name]
+            if options['dry_run']:
+                count = source.model._base_manager.filter(**{f'{source.date_field}__lt': cutoff}).count()
+                self.stdout.write(f"{name}: {count} rows to archive")
+                continue
+
+            moved = chunks = 0
+            while options['max_chunks'] is None or chunks < options['max_chunks']:
+                archived = archive_chunk(source, cutoff, options['chunk_size'])
+                if not archived:
+                    break
+                moved += archived
+                chunks += 1
+                self.stdout.write(f"  {name}: {moved} rows archived")
+            self.stdout.write(self.style.SUCCESS(f"{name}: {moved} rows archived in {chunks} chunk(s)"))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=64)),
+                ('object_repr', models.CharField(blank=True, max_length=200)),
+                ('action', models.CharField(choices=[('CREATE', 'Create'), ('UPDATE', 'Update'), ('DELETE', 'Delete')], max_length=10)),
+                ('changes', models.JSONField(blank=True, default=dict)),
+                ('changed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Audit Entry',
+                'verbose_name_plural': 'Audit Entries',
+                'ordering': ['-changed_at'],
+                'indexes': [models.Index(fields=['content_type', 'object_id', 'changed_at'], name='audit_object_changed_idx')],
+            },
+        ),
+    ]
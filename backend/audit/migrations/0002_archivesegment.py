@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# django.contrib.admin's LogEntry is sorted by action_time on every changelist page
+# and archived by it, but has no index on it
+LOG_ENTRY_TIME_INDEX = models.Index(fields=['action_time'], name='audit_admin_log_time_idx')
+
+
+def add_log_entry_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('admin', 'LogEntry'), LOG_ENTRY_TIME_INDEX)
+
+
+def remove_log_entry_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('admin', 'LogEntry'), LOG_ENTRY_TIME_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin', '0001_initial'),
+        ('audit', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('month', models.DateField(help_text='First day of the month the rows were written in')),
+                ('path', models.CharField(help_text='Relative to settings.ARCHIVE_ROOT', max_length=255, unique=True)),
+                ('first_pk', models.BigIntegerField()),
+                ('last_pk', models.BigIntegerField()),
+                ('row_count', models.PositiveIntegerField()),
+                ('key_min', models.BigIntegerField(blank=True, null=True)),
+                ('key_max', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'verbose_name': 'Archive Segment',
+                'verbose_name_plural': 'Archive Segments',
+                'ordering': ['source', 'month', 'first_pk'],
+                'indexes': [models.Index(fields=['source', 'month'], name='audit_segment_source_idx')],
+            },
+        ),
+        migrations.RunPython(add_log_entry_index, remove_log_entry_index),
+    ]
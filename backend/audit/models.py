@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils import timezone
+
+
+class AuditEntry(models.Model):
+    """
+    One create, update or delete of any audited model.
+
+    `changes` holds only the fields that changed, as {"field": [old, new]}. A delete
+    keeps the last values of every field so the row can still be reconstructed.
+    """
+    ACTION_CHOICES = [
+        ('CREATE', 'Create'),
+        ('UPDATE', 'Update'),
+        ('DELETE', 'Delete'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.PROTECT)
+    # Text so any primary key type fits, like django.contrib.admin's LogEntry
+    object_id = models.CharField(max_length=64)
+    content_object = GenericForeignKey('content_type', 'object_id')
+    object_repr = models.CharField(max_length=200, blank=True)
+
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changes = models.JSONField(default=dict, blank=True)
+    changed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
+
+    class Meta:
+        ordering = ['-changed_at']
+        verbose_name = "Audit Entry"
+        verbose_name_plural = "Audit Entries"
+        indexes = [
+            # History of one object, newest first
+            models.Index(fields=['content_type', 'object_id', 'changed_at'], name='audit_object_changed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} - {self.object_repr} at {self.changed_at} by {self.changed_by}"
+
+
+class ArchiveSegment(models.Model):
+    """
+    One gzip NDJSON file of history rows moved out of the database by archive_history.
+
+    Files hold one month of one source; key_min/key_max bound the numeric object key
+    (e.g. the bank statement id) so lookups only open files that can contain it.
+    """
+    source = models.CharField(max_length=50)
+    month = models.DateField(help_text="First day of the month the rows were written in")
+    path = models.CharField(max_length=255, unique=True, help_text="Relative to settings.ARCHIVE_ROOT")
+    first_pk = models.BigIntegerField()
+    last_pk = models.BigIntegerField()
+    row_count = models.PositiveIntegerField()
+    key_min = models.BigIntegerField(null=True, blank=True)
+    key_max = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ['source', 'month', 'first_pk']
+        verbose_name = "Archive Segment"
+        verbose_name_plural = "Archive Segments"
+        indexes = [
+            models.Index(fields=['source', 'month'], name='audit_segment_source_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.month:%Y-%m} ({self.row_count} rows)"
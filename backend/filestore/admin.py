@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.db.models import Count, Sum
+
+from .models import StoredFile
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    """Read-only view of the content-addressed store, maintained by its storage backend"""
+
+    list_display = ('name', 'size', 'ref_count', 'created_at')
+    search_fields = ('sha256', 'name')
+    date_hierarchy = 'created_at'
+
+    def changelist_view(self, request, extra_context=None):
+        totals = StoredFile.objects.aggregate(files=Count('id'), size=Sum('size'), references=Sum('ref_count'))
+        extra_context = dict(extra_context or {}, subtitle=(
+            f"{totals['files']} files, {(totals['size'] or 0) / 1024 ** 2:.1f} MB, "
+            f"{totals['references'] or 0} references"
+        ))
+        return super().changelist_view(request, extra_context)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
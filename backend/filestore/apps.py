@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class FilestoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'filestore'
+    verbose_name = "File Store"
+
+    def ready(self):
+        # Release stored files when the rows referencing them are deleted or replaced
+        from .references import connect_file_fields
+        connect_file_fields()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from filestore.references import STORED_FIELDS, move_to_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Move files uploaded before the content-addressed store into it, deduplicating them, "
+        "and point the rows at the stored copies. Safe to interrupt and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only count the files that would move")
+
+    def handle(self, *args, **options):
+        for model, fields in STORED_FIELDS.items():
+            for field in fields:
+                moved, missing = move_to_store(model, field, dry_run=options['dry_run'])
+                self.stdout.write(f"{model._meta.label}.{field.name}: {moved} files moved")
+                for name in missing:
+                    self.stderr.write(f"  missing on disk: {name}")
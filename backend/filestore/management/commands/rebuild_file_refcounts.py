@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from filestore.references import recount_references
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the references to every file in the content-addressed store from the rows "
+        "pointing at it and delete the files nothing points at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would change")
+
+    def handle(self, *args, **options):
+        changed, deleted, missing = recount_references(dry_run=options['dry_run'])
+        verb = "would be" if options['dry_run'] else "were"
+        self.stdout.write(f"{changed} reference counts {verb} corrected, {deleted} unreferenced files {verb} deleted")
+        for name in missing:
+            self.stderr.write(f"Referenced but missing: {name}")
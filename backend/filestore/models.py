@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class StoredFile(models.Model):
+    """
+    One distinct file content in the content-addressed store. `ref_count` is the
+    number of file fields pointing at it; the file is deleted when it drops to 0.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, help_text="Path under MEDIA_ROOT")
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Stored File"
+        verbose_name_plural = "Stored Files"
+
+    def __str__(self):
+        return self.name
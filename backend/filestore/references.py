@@ -0,0 +1,169 @@
+"""
+Reference counting for the FileFields kept in the content-addressed store.
+
+Django neither deletes a file when its row is deleted nor when the field gets
+another file. For fields on ContentAddressedStorage the signals connected here
+release the old file once the transaction commits, which lowers its ref_count.
+Writes that bypass the signals (QuerySet.update(), raw SQL) leave the counts off;
+recount_references() recomputes them from the rows.
+"""
+from collections import Counter
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F, FileField
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from .models import StoredFile
+from .storage import BLOB_ROOT, ContentAddressedStorage, content_addressed_storage, is_blob_name
+
+# Rows read per query when recounting or moving files
+REFERENCE_CHUNK_SIZE = 2000
+
+
+def stored_file_fields():
+    """{model: [FileField, ...]} of the fields on ContentAddressedStorage"""
+    fields = {}
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage):
+                fields.setdefault(model, []).append(field)
+    return fields
+
+
+def release_files(names):
+    """Drop one reference to each stored file in `names` once the transaction commits"""
+    names = [name for name in names if is_blob_name(name)]
+    if names:
+        storage = content_addressed_storage()
+        transaction.on_commit(lambda: [storage.delete(name) for name in names])
+
+
+def file_name(value):
+    """Name of a FileField value as held in the instance: a name, a FieldFile or None"""
+    return getattr(value, 'name', value) or ''
+
+
+def _remember_loaded(sender, instance, **kwargs):
+    # The names the row was loaded with, so a save can tell which files it replaces
+    instance._stored_files = {
+        field.attname: file_name(instance.__dict__[field.attname])
+        for field in STORED_FIELDS[sender] if field.attname in instance.__dict__
+    }
+
+
+def _remember_files(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    # Only fields deferred when the row was loaded are read from the database
+    stored = instance.__dict__.setdefault('_stored_files', {})
+    deferred = [field.attname for field in STORED_FIELDS[sender] if field.attname not in stored]
+    if deferred:
+        stored.update(sender._base_manager.filter(pk=instance.pk).values(*deferred).first() or {})
+
+
+def _release_replaced(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    current = {field.attname: getattr(instance, field.attname).name or '' for field in STORED_FIELDS[sender]}
+    previous = instance.__dict__.get('_stored_files') or {}
+    if update_fields is not None:
+        current = {attname: name for attname, name in current.items() if attname in update_fields}
+    if not (created or raw):
+        release_files(name for attname, name in previous.items() if attname in current and name != current[attname])
+    instance._stored_files = {**previous, **current}
+
+
+def _release_deleted(sender, instance, **kwargs):
+    release_files(getattr(instance, field.attname).name for field in STORED_FIELDS[sender])
+
+
+STORED_FIELDS = {}
+
+
+def connect_file_fields():
+    STORED_FIELDS.update(stored_file_fields())
+    for model in STORED_FIELDS:
+        uid = model._meta.label_lower
+        post_init.connect(_remember_loaded, sender=model, dispatch_uid=f'filestore_post_init_{uid}')
+        pre_save.connect(_remember_files, sender=model, dispatch_uid=f'filestore_pre_save_{uid}')
+        post_save.connect(_release_replaced, sender=model, dispatch_uid=f'filestore_post_save_{uid}')
+        post_delete.connect(_release_deleted, sender=model, dispatch_uid=f'filestore_post_delete_{uid}')
+
+
+def iter_field_names(model, field, blobs=True):
+    """Non-empty names in `field` of all rows, only stored files or only older ones"""
+    names = model._base_manager.exclude(**{field.attname: ''}).exclude(**{f'{field.attname}__isnull': True})
+    lookup = {f'{field.attname}__startswith': f'{BLOB_ROOT}/'}
+    names = names.filter(**lookup) if blobs else names.exclude(**lookup)
+    return names.values_list('pk', field.attname).iterator(chunk_size=REFERENCE_CHUNK_SIZE)
+
+
+def recount_references(dry_run=False):
+    """
+    Set every StoredFile.ref_count from the rows pointing at it and delete the files
+    nothing points at. Returns (counts changed, files deleted, names referenced but missing).
+    """
+    counts = Counter()
+    for model, fields in STORED_FIELDS.items():
+        for field in fields:
+            counts.update(name for pk, name in iter_field_names(model, field))
+
+    storage = content_addressed_storage()
+    changed, deleted = 0, 0
+    known = set()
+    for stored in StoredFile.objects.iterator(chunk_size=REFERENCE_CHUNK_SIZE):
+        known.add(stored.name)
+        references = counts[stored.name]
+        if references == stored.ref_count:
+            continue
+        changed += 1
+        if dry_run:
+            deleted += not references
+        elif references:
+            StoredFile.objects.filter(pk=stored.pk).update(ref_count=references)
+        else:
+            stored.delete()
+            storage.delete_file(stored.name)
+            deleted += 1
+    missing = []
+    for name in sorted(set(counts) - known):
+        if not storage.exists(name):
+            missing.append(name)
+            continue
+        changed += 1
+        if not dry_run:
+            # A file whose row went missing, e.g. with a rolled back upload
+            StoredFile.objects.create(
+                sha256=PurePosixPath(name).stem, name=name, size=storage.size(name), ref_count=counts[name],
+            )
+    missing += sorted(name for name in counts.keys() & known if not storage.exists(name))
+    return changed, deleted, missing
+
+
+def move_to_store(model, field, dry_run=False):
+    """
+    Copy the files of `field` uploaded before the store into it and point the rows at
+    them; the old files are removed once every row is moved. Returns (moved, missing names).
+    """
+    storage = content_addressed_storage()
+    moved, missing, blobs = 0, [], {}
+    for pk, name in iter_field_names(model, field, blobs=False):
+        if name in blobs:
+            # Another row with the same old file
+            StoredFile.objects.filter(name=blobs[name]).update(ref_count=F('ref_count') + 1)
+        elif not storage.exists(name):
+            missing.append(name)
+            continue
+        elif not dry_run:
+            with storage.open(name) as file:
+                blobs[name] = storage.save(name, file)
+        else:
+            blobs[name] = None
+        if not dry_run:
+            # update() so the signals do not release anything
+            model._base_manager.filter(pk=pk).update(**{field.attname: blobs[name]})
+        moved += 1
+    if not dry_run:
+        for name in blobs:
+            storage.delete(name)
+    return moved, missing
@@ -0,0 +1,114 @@
+"""
+Content-addressed storage for uploaded documents.
+
+An upload is hashed while it is streamed to disk and stored once per content, under
+a two-level fan-out of its SHA-256:
+
+    blobs/3f/a2/3fa2...c9.pdf
+
+so no directory holds more than a few thousand files however many are uploaded, and
+a backup can skip whole unchanged directories. The same scanned voucher uploaded
+again is not written a second time: StoredFile.ref_count goes up and the field gets
+the existing name. delete() lowers the count and removes the file once nothing
+points at it (see filestore.references for the model hooks). The directory in a
+field's upload_to is not used; files uploaded before the store keep their names.
+
+    bank_voucher = models.FileField(upload_to='vouchers/', storage=content_addressed_storage)
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import PurePosixPath
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+BLOB_ROOT = 'blobs'
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(BLOB_ROOT + '/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def blob_name(self, sha256, name):
+        # The extension stays so the file is served with its content type
+        extension = PurePosixPath(name).suffix.lower()[:10]
+        return f"{BLOB_ROOT}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+    def get_available_name(self, name, max_length=None):
+        # The stored name follows from the content, see _save
+        return name
+
+    def _save(self, name, content):
+        temp_dir = self.path(f"{BLOB_ROOT}/tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        digest, size = hashlib.sha256(), 0
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            blob = self.add_reference(sha256, self.blob_name(sha256, name), size)
+            # After the reference, so a concurrent delete of the last one cannot remove it;
+            # replacing an existing copy with the same bytes is harmless
+            path = self.path(blob)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return blob
+
+    def add_reference(self, sha256, name, size):
+        """Count one more reference to the content `sha256`, returns its stored name"""
+        from .models import StoredFile
+
+        stored = StoredFile.objects.filter(sha256=sha256)
+        if not stored.update(ref_count=F('ref_count') + 1):
+            try:
+                with transaction.atomic():
+                    StoredFile.objects.create(sha256=sha256, name=name, size=size, ref_count=1)
+                    return name
+            except IntegrityError:
+                # Stored by a concurrent upload since the UPDATE
+                stored.update(ref_count=F('ref_count') + 1)
+        # Same content uploaded before, maybe with another extension
+        return stored.values_list('name', flat=True).get()
+
+    def delete(self, name):
+        from .models import StoredFile
+
+        if not is_blob_name(name):
+            return super().delete(name)
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(name=name).first()
+            if stored is None:
+                return
+            if stored.ref_count > 1:
+                StoredFile.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') - 1)
+                return
+            stored.delete()
+            self.delete_file(name)
+
+    def delete_file(self, name):
+        """Remove the file itself, whatever references it has"""
+        super().delete(name)
+
+
+_storage = None
+
+
+def content_addressed_storage():
+    """The storage of FileFields, a callable so migrations do not record its settings"""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
@@ -1,11 +1,13 @@
 from django.contrib import admin
+from audit.engine import AuditedAdminMixin
+from rjbcl.admin_export import ExportMixin
 from django.utils.html import format_html
 from django.db.models import Q
 from .models import MemoRecord
 
 
 @admin.register(MemoRecord)
-class MemoRecordAdmin(admin.ModelAdmin):
+class MemoRecordAdmin(AuditedAdminMixin, ExportMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'date_of_record',
@@ -15,6 +17,7 @@ class MemoRecordAdmin(admin.ModelAdmin):
         'related_department',
         'is_final',
     )
+    export_exclude = ('memo_document_link',)
 
     list_filter = (
         'memo_type',
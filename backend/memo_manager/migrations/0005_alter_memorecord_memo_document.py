@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:33
+
+import filestore.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memo_manager', '0004_alter_memorecord_fy_title'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='memorecord',
+            name='memo_document',
+            field=models.FileField(blank=True, null=True, storage=filestore.storage.content_addressed_storage, upload_to='memos/%Y/%m/', verbose_name='मेमोको फाइल (Memo Document File)'),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.conf import settings
 from rjbcl.common_data import FISCAL_YEAR_CHOICES
 from ticket.models import Department
 from tinymce.models import HTMLField
+from filestore.storage import content_addressed_storage
 
 
 
@@ -48,6 +49,7 @@ class MemoRecord(models.Model):
     )
     memo_document = models.FileField(
         upload_to='memos/%Y/%m/',
+        storage=content_addressed_storage,
         verbose_name="मेमोको फाइल (Memo Document File)",
         blank=True,
         null=True
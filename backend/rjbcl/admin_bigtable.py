@@ -0,0 +1,193 @@
+"""
+Big-table mode for ModelAdmin changelists.
+
+Django's changelist counts every matching row for its paginator and, with a
+date_hierarchy, runs MIN/MAX and DISTINCT year/month/day queries on every load. On
+tables with millions of rows those queries cost more than the page itself. Put
+BigTableMixin in front of admin.ModelAdmin and:
+
+- the unfiltered count is the row estimate from the table statistics (MySQL
+  information_schema, PostgreSQL pg_class), exact below big_table_exact_below rows;
+- filtered counts, and the unfiltered one where the database keeps no estimate, are
+  counted once and cached for count_cache_timeout seconds;
+- the second, unfiltered count of show_full_result_count is skipped;
+- the date hierarchy links are cached for date_hierarchy_cache_timeout seconds.
+
+A list_filter on a plain column lists its distinct values with a SELECT DISTINCT over
+the table; CachedAllValuesFieldListFilter caches that list as well.
+
+    class LogEntryAdmin(BigTableMixin, admin.ModelAdmin):
+        date_hierarchy = 'action_time'
+        count_cache_timeout = 300
+
+Cached and estimated counts may be off by the rows written since, so pages past the
+counted end are still served instead of raising an error. A changelist with its own
+change_list_template extends admin/bigtable_change_list.html.
+"""
+import copy
+import hashlib
+
+from django.contrib.admin.filters import AllValuesFieldListFilter
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import InvalidPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+CACHE_PREFIX = 'bigtable'
+
+
+def estimated_row_count(model, using):
+    """Row estimate of the model's table from the database statistics, None where there are none"""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'mysql':
+        sql = "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+        params = [table]
+    elif connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)"
+        params = [connection.ops.quote_name(table)]
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for a table that was never analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def queryset_cache_key(queryset, kind):
+    """Cache key for a value computed from `queryset`, None when the query matches nothing"""
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    digest = hashlib.sha1(f"{queryset.db}|{sql}|{params!r}|{kind}".encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{queryset.model._meta.label_lower}:{digest}"
+
+
+def cached_queryset_value(queryset, kind, compute, timeout):
+    """compute(), cached for `timeout` seconds per query and `kind`"""
+    key = queryset_cache_key(queryset, kind)
+    if key is None:
+        return compute()
+    return cache.get_or_set(key, compute, timeout)
+
+
+def is_unfiltered(queryset):
+    query = queryset.query
+    return not query.where and not query.distinct and query.low_mark == 0 and query.high_mark is None
+
+
+class BigTablePaginator(Paginator):
+    """Paginator counting with estimates and cached counts; `count_note` tells which one was used"""
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True,
+                 exact_below=10000, count_cache_timeout=120):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.exact_below = exact_below
+        self.count_cache_timeout = count_cache_timeout
+        self.count_note = ''
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if is_unfiltered(queryset):
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.exact_below:
+                self.count_note = "estimated from table statistics"
+                return estimate
+        self.count_note = f"counted within the last {self.count_cache_timeout // 60 or 1} minute(s)"
+        return cached_queryset_value(queryset, 'count', queryset.count, self.count_cache_timeout)
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise InvalidPage("That page number is less than 1")
+        # No upper bound: the count may trail the rows written since it was taken
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class CachedDateQueries:
+    """Stands in for ChangeList.queryset in Django's date_hierarchy tag and caches its queries"""
+
+    def __init__(self, queryset, timeout):
+        self.queryset = queryset
+        self.timeout = timeout
+
+    def _cached(self, kind, compute):
+        # datetimes() truncates in the active time zone
+        kind = f"{kind}|{timezone.get_current_timezone_name()}"
+        return cached_queryset_value(self.queryset, kind, compute, self.timeout)
+
+    def aggregate(self, **aggregates):
+        return self._cached(f"aggregate:{sorted(aggregates)!r}", lambda: self.queryset.aggregate(**aggregates))
+
+    def dates(self, field_name, kind):
+        return self._cached(f"dates:{field_name}:{kind}", lambda: list(self.queryset.dates(field_name, kind)))
+
+    def datetimes(self, field_name, kind):
+        return self._cached(f"datetimes:{field_name}:{kind}", lambda: list(self.queryset.datetimes(field_name, kind)))
+
+
+class CachedAllValuesFieldListFilter(AllValuesFieldListFilter):
+    """AllValuesFieldListFilter whose distinct values are cached: list_filter = [('bank_name', CachedAllValuesFieldListFilter)]"""
+    cache_timeout = 600
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        choices = self.lookup_choices
+        self.lookup_choices = cached_queryset_value(choices, 'choices', lambda: list(choices), self.cache_timeout)
+
+
+class BigTableChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        if (self.show_all and self.can_show_all) or not self.multi_page:
+            # Django lists every row when the count says they fit one page; a cached
+            # count may trail the table, so never render more than that page holds
+            limit = self.list_max_show_all if self.show_all else self.list_per_page
+            self.result_list = self.result_list[:limit]
+
+
+class BigTableMixin:
+    change_list_template = "admin/bigtable_change_list.html"
+    paginator = BigTablePaginator
+    show_full_result_count = False
+    # Unfiltered tables estimated below this many rows are counted exactly
+    big_table_exact_below = 10000
+    count_cache_timeout = 120
+    date_hierarchy_cache_timeout = 600
+
+    def get_changelist(self, request, **kwargs):
+        return BigTableChangeList
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            exact_below=self.big_table_exact_below, count_cache_timeout=self.count_cache_timeout,
+        )
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        if hasattr(response, 'context_data') and 'cl' in response.context_data:
+            cl = response.context_data['cl']
+            if cl.date_hierarchy:
+                # Django's date_hierarchy tag on a copy of the changelist whose queries are cached
+                cached_cl = copy.copy(cl)
+                cached_cl.queryset = CachedDateQueries(cl.queryset, self.date_hierarchy_cache_timeout)
+                response.context_data['date_hierarchy'] = date_hierarchy(cached_cl)
+        return response
@@ -0,0 +1,144 @@
+"""
+CSV and XLSX export actions for any ModelAdmin.
+
+Add ExportMixin in front of admin.ModelAdmin and the changelist gets "Export selected
+as CSV" and "Export selected as XLSX". The columns are the admin's list_display:
+
+    class TaskAdmin(ExportMixin, admin.ModelAdmin):
+        list_display = ('title', 'department', 'status', 'assigned_users')
+        export_exclude = ('download_button',)
+        export_prefetch_related = ('assigned_to',)
+
+Foreign keys in list_display are joined with select_related, export_prefetch_related
+covers columns that read many-to-many relations, and rows are read with iterator() in
+chunks, so memory does not grow with the number of rows exported.
+
+Other CSV downloads stream their rows through stream_csv_response() the same way.
+"""
+import csv
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.contrib.admin.utils import label_for_field, lookup_field
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+# Rows fetched from the database per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv_response(rows, filename):
+    """StreamingHttpResponse writing a UTF-8 BOM and then `rows`, header first, as they are produced"""
+    writer = csv.writer(Echo(), quoting=csv.QUOTE_ALL)
+
+    def lines():
+        yield '\ufeff'  # UTF-8 BOM
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+class ExportMixin:
+    # list_display entries left out of the export, e.g. download buttons
+    export_exclude = ()
+    # Relations read by list_display methods, prefetched per chunk
+    export_prefetch_related = ()
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if self.has_view_permission(request):
+            for name in ('export_selected_as_csv', 'export_selected_as_xlsx'):
+                if name not in actions:
+                    actions[name] = self.get_action(name)
+        return actions
+
+    def get_export_fields(self, request):
+        return [
+            name for name in self.get_list_display(request)
+            if name != 'action_checkbox' and name not in self.export_exclude
+        ]
+
+    def get_export_queryset(self, request, queryset, fields):
+        """Join the foreign keys shown in `fields` so str(related) costs no query"""
+        related = []
+        for name in fields:
+            if not isinstance(name, str):
+                continue
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one or field.one_to_one:
+                related.append(name)
+        if related:
+            queryset = queryset.select_related(*related)
+        if self.export_prefetch_related:
+            queryset = queryset.prefetch_related(*self.export_prefetch_related)
+        return queryset
+
+    def export_value(self, name, obj):
+        """Plain value of one list_display column: choice labels, related objects as text, HTML stripped"""
+        field, attr, value = lookup_field(name, obj, self)
+        if value is None:
+            return ''
+        if field is not None and field.flatchoices:
+            return dict(field.flatchoices).get(value, value)
+        if isinstance(value, models.Model):
+            return str(value)
+        if isinstance(value, datetime) and timezone.is_aware(value):
+            # Excel has no time zones, write the local time the admin shows
+            return timezone.localtime(value).replace(tzinfo=None)
+        if isinstance(value, (int, float, Decimal, date, time)):
+            return value
+        return strip_tags(str(value))
+
+    def iter_export_rows(self, request, queryset):
+        """Yield the header and then one list per object"""
+        fields = self.get_export_fields(request)
+        yield [strip_tags(str(label_for_field(name, self.model, self))) for name in fields]
+        queryset = self.get_export_queryset(request, queryset, fields)
+        for obj in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield [self.export_value(name, obj) for name in fields]
+
+    def get_export_filename(self, extension):
+        return f"{slugify(self.model._meta.verbose_name_plural)}.{extension}"
+
+    def export_selected_as_csv(self, request, queryset):
+        return stream_csv_response(self.iter_export_rows(request, queryset), self.get_export_filename('csv'))
+
+    export_selected_as_csv.short_description = "Export selected as CSV"
+
+    def export_selected_as_xlsx(self, request, queryset):
+        # Write-only workbooks spool rows to disk, and the saved file is streamed from disk
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title=str(self.model._meta.verbose_name_plural)[:31])
+        for row in self.iter_export_rows(request, queryset):
+            # Control characters pasted into text fields are not allowed in XLSX cells
+            sheet.append([ILLEGAL_CHARACTERS_RE.sub('', value) if isinstance(value, str) else value for value in row])
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return FileResponse(
+            output, as_attachment=True, filename=self.get_export_filename('xlsx'), content_type=XLSX_CONTENT_TYPE,
+        )
+
+    export_selected_as_xlsx.short_description = "Export selected as XLSX"
@@ -63,6 +63,8 @@ INSTALLED_APPS = [
     'memo_manager',
     'assets_manager',
     'rjbcl_workflow_manager',
+    'filestore',
+    'audit',
 
     'kyc',
 ]
@@ -175,6 +177,20 @@ DEFAULT_FROM_EMAIL = 'your_email@gmail.com'
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
+# History retention: the archive_history command moves change history and admin log
+# entries older than HISTORY_RETENTION_DAYS into gzip files under ARCHIVE_ROOT
+HISTORY_RETENTION_DAYS = int(os.getenv('HISTORY_RETENTION_DAYS', 730))
+ARCHIVE_ROOT = BASE_DIR / "archive"
+
+# Cache shared by all gunicorn workers, so a write that invalidates a dashboard widget
+# (statement_tracker.dashboard) does so for every worker
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_DIR', BASE_DIR / 'cache'),
+    }
+}
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # For collectstatic
@@ -206,3 +222,11 @@ CSRF_COOKIE_SECURE = True
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_AGE = 1800
 
+# Sessions are read from the cache and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# SecureSessionMiddleware logs out after this many seconds without a request, and
+# stores the time of the last request only when it moved by SESSION_ACTIVITY_GRANULARITY
+# seconds, so a session is written about once a minute instead of on every request
+SESSION_INACTIVITY_TIMEOUT = 30 * 60
+SESSION_ACTIVITY_GRANULARITY = int(os.getenv('SESSION_ACTIVITY_GRANULARITY', 60))
+
@@ -22,7 +22,7 @@ from rest_framework import permissions
 from django.conf import  settings
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
-from statement_tracker.views import api_index, dashboard
+from statement_tracker.views import api_index, dashboard, dashboard_widgets
 from user_request_app import  views as user_request_app_view
 
 
@@ -37,8 +37,10 @@ urlpatterns = [
     # path('kyc/', include('kyc.urls')),
 
 
- # Sample dashboard
+ # Operations dashboard, its widgets as JSON under dashboard/widgets/
      path('dashboard/', dashboard, name='dashboard'),
+     path('dashboard/widgets/', dashboard_widgets, name='dashboard_widgets'),
+     path('dashboard/widgets/<slug:name>/', dashboard_widgets, name='dashboard_widget'),
 
 # URLS for swagger
 
@@ -0,0 +1,77 @@
+"""
+Streaming reads of uploaded XLSX workbooks.
+
+pd.read_excel and a normal openpyxl workbook build every cell of every sheet before
+the first row can be used. In read-only mode openpyxl parses a sheet's XML while it
+is iterated, so memory stays flat however many rows a workbook has:
+
+    for sheet in iter_sheets(upload):
+        for row_no, values in sheet.rows:
+            ...
+
+Cells come back as Python values: str, int, float, datetime, or None when empty.
+"""
+from openpyxl import load_workbook
+
+# Every XLSX file is a zip archive, which starts with a local file header
+XLSX_SIGNATURE = b'PK\x03\x04'
+
+
+def is_xlsx(file):
+    """Whether a binary file is a workbook rather than text; the file is rewound"""
+    file.seek(0)
+    signature = file.read(len(XLSX_SIGNATURE))
+    file.seek(0)
+    return signature == XLSX_SIGNATURE
+
+
+def header_text(value):
+    return '' if value is None else str(value).strip()
+
+
+class Sheet:
+    """
+    One worksheet: its `header` and the `rows` after it, as (row number, values) with
+    one value per header column. Blank rows are left out.
+    """
+
+    def __init__(self, title, header, header_row_no, rows):
+        self.title = title
+        self.header = header
+        self.header_row_no = header_row_no
+        self.rows = rows
+
+
+def _non_blank(rows):
+    for row_no, values in rows:
+        if any(value is not None and value != '' for value in values):
+            yield row_no, values
+
+
+def _padded(rows, width):
+    for row_no, values in rows:
+        yield row_no, (values + (None,) * width)[:width]
+
+
+def iter_sheets(file, skip_rows=0):
+    """
+    Yield a Sheet per worksheet that has a header row, which is the first non-blank
+    row after `skip_rows`. Each sheet's rows must be read before moving on to the next.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            # Read-only sheets may carry wrong dimensions from the writer, leaving rows out
+            worksheet.reset_dimensions()
+            rows = enumerate(worksheet.iter_rows(values_only=True), start=1)
+            rows = ((row_no, values) for row_no, values in rows if row_no > skip_rows)
+            first = next(_non_blank(rows), None)
+            if first is None:
+                continue
+            header_row_no, header = first
+            header = [header_text(value) for value in header]
+            while header and not header[-1]:
+                header.pop()
+            yield Sheet(worksheet.title, header, header_row_no, _padded(_non_blank(rows), len(header)))
+    finally:
+        workbook.close()
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from audit.engine import AuditedAdminMixin
+from rjbcl.admin_bigtable import BigTableMixin
+from rjbcl.admin_export import ExportMixin
 from django.http import HttpResponse
 from django.utils.html import format_html
 from django.utils import timezone
@@ -46,7 +49,7 @@ class RequestAttachmentInline(admin.TabularInline):
 
 
 @admin.register(ChangeRequest)
-class ChangeRequestAdmin(admin.ModelAdmin):
+class ChangeRequestAdmin(AuditedAdminMixin, ExportMixin, BigTableMixin, admin.ModelAdmin):
     list_display = (
         'request_number',
         'download_pdf_button',
@@ -61,6 +64,7 @@ class ChangeRequestAdmin(admin.ModelAdmin):
         'submitted_at',
         'days_open'
     )
+    export_exclude = ('download_pdf_button',)
 
     list_filter = (
         'status',
@@ -194,80 +198,58 @@ class ChangeRequestAdmin(admin.ModelAdmin):
         return qs.filter(requested_by=request.user)
 
     def save_model(self, request, obj, form, change):
-        """Auto-populate fields and create history"""
+        """Auto-populate fields, and record status changes in the workflow history"""
 
         if not change:
             obj.from_department = request.user.department
-
-
-        if not change:  # New object
             obj.requested_by = request.user
-            action = 'CREATED'
-            notes = f"अनुरोध सिर्जना गरियो (Request created)"
-        else:
-            action = 'UPDATED'
-            notes = "अनुरोध अद्यावधिक गरियो (Request updated)"
-
-            # Track specific status changes
-            if 'status' in form.changed_data:
-                old_status = form.initial.get('status')
-                new_status = obj.status
-
-                # Update timestamps based on status
-                if new_status == 'SUBMITTED' and not obj.submitted_at:
-                    obj.submitted_at = timezone.now()
-                    action = 'SUBMITTED'
-                elif new_status == 'UNDER_REVIEW' and not obj.reviewed_at:
-                    obj.reviewed_at = timezone.now()
-                    obj.reviewed_by = request.user
-                elif new_status == 'APPROVED' and not obj.approved_at:
-                    obj.approved_at = timezone.now()
-                    obj.approved_by = request.user
-                    action = 'APPROVED'
-                elif new_status == 'REJECTED':
-                    action = 'REJECTED'
-                elif new_status == 'IN_PROGRESS' and not obj.started_at:
-                    obj.started_at = timezone.now()
-                elif new_status == 'COMPLETED' and not obj.completed_at:
-                    obj.completed_at = timezone.now()
-                    obj.completed_by = request.user
-                    action = 'COMPLETED'
-                elif new_status == 'CLOSED' and not obj.closed_at:
-                    obj.closed_at = timezone.now()
-                    action = 'CLOSED'
-
-                notes = f"अवस्था परिवर्तन: {old_status} → {new_status}"
+
+        # Field edits are recorded by AuditedAdminMixin, the workflow history only keeps the steps
+        status_changed = change and 'status' in form.changed_data
+        if status_changed:
+            old_status = form.initial.get('status')
+            new_status = obj.status
+            action = 'STATUS_CHANGED'
+
+            # Update timestamps based on status
+            if new_status == 'SUBMITTED' and not obj.submitted_at:
+                obj.submitted_at = timezone.now()
+                action = 'SUBMITTED'
+            elif new_status == 'UNDER_REVIEW' and not obj.reviewed_at:
+                obj.reviewed_at = timezone.now()
+                obj.reviewed_by = request.user
+            elif new_status == 'APPROVED' and not obj.approved_at:
+                obj.approved_at = timezone.now()
+                obj.approved_by = request.user
+                action = 'APPROVED'
+            elif new_status == 'REJECTED':
+                action = 'REJECTED'
+            elif new_status == 'IN_PROGRESS' and not obj.started_at:
+                obj.started_at = timezone.now()
+            elif new_status == 'COMPLETED' and not obj.completed_at:
+                obj.completed_at = timezone.now()
+                obj.completed_by = request.user
+                action = 'COMPLETED'
+            elif new_status == 'CLOSED' and not obj.closed_at:
+                obj.closed_at = timezone.now()
+                action = 'CLOSED'
 
         super().save_model(request, obj, form, change)
 
+        if status_changed:
+            RequestHistory.objects.create(
+                request=obj,
+                action=action,
+                performed_by=request.user,
+                notes=f"अवस्था परिवर्तन: {old_status} → {new_status}"
+            )
+
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
         form.base_fields['category'].required = True
         form.base_fields['reference_number'].required = True
         return form
 
-        # Create history record
-        RequestHistory.objects.create(
-            request=obj,
-            action=action,
-            performed_by=request.user,
-            notes=notes
-        )
-
-        # Track field changes
-        if change and form.changed_data:
-            for field in form.changed_data:
-                if field != 'last_modified':
-                    RequestHistory.objects.create(
-                        request=obj,
-                        action='UPDATED',
-                        performed_by=request.user,
-                        field_changed=field,
-                        old_value=str(form.initial.get(field, '')),
-                        new_value=str(form.cleaned_data.get(field, '')),
-                        notes=f"क्षेत्र परिवर्तन: {field}"
-                    )
-
     # Custom display methods
     def title_short(self, obj):
         return obj.title[:50] + '...' if len(obj.title) > 50 else obj.title
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:33
+
+import filestore.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rjbcl_workflow_manager', '0003_alter_changerequest_category'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='requestattachment',
+            name='file',
+            field=models.FileField(storage=filestore.storage.content_addressed_storage, upload_to='request_attachments/%Y/%m/', verbose_name='फाइल (File)'),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.core.exceptions import ValidationError
 from tinymce.models import HTMLField
 from django.contrib.auth import get_user_model
 from ticket.models import Department
+from filestore.storage import content_addressed_storage
 
 User = get_user_model()
 
@@ -508,6 +509,7 @@ class RequestAttachment(models.Model):
 
     file = models.FileField(
         upload_to='request_attachments/%Y/%m/',
+        storage=content_addressed_storage,
         verbose_name="फाइल (File)"
     )
 
@@ -1,27 +1,40 @@
 from django.utils import timezone
 
-from .models import User, BankStatementChangeHistory
+from .models import User, BankStatementChangeHistory, DailyStatementSummary, StatementImportJob
 
 from django.contrib.admin import AdminSite
 from django.utils.translation import gettext_lazy as _
-import copy
 
 
 
-from django.http import HttpResponse
+from django.core.exceptions import PermissionDenied
+from django.db.models import Sum
+from django.http import HttpResponse, JsonResponse
 
 from django import forms
 from django.contrib import  messages
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import path
 from .models import BankStatement
+from audit.engine import AuditedAdminMixin
+from rjbcl.admin_bigtable import BigTableMixin, CachedAllValuesFieldListFilter, cached_queryset_value
+from rjbcl.admin_export import ExportMixin
+from .bulk_edit import BULK_EDIT_FIELDS, BulkEditError, apply_bulk_edits, export_bulk_edit_csv, parse_bulk_edit_csv
+from .exporter import export_change_history, export_statements
+from .importer import queue_statement_files
+from .parallel_import import STATEMENT_FILE_EXTENSIONS, iter_upload_files
+from .statement_parser import PROFILE_CHOICES
+from .search import amount_q, search_available, search_statements
+from .policies import policy_q
+from .aging import aging_report, export_aging_report, invalidate_aging_report
+from .reconciliation import unreconciled_statements
 import csv
-import io
-from datetime import datetime
+import zipfile
 from django.contrib.admin.models import LogEntry, ADDITION, CHANGE, DELETION
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.urls import reverse
+from django.utils.http import urlencode
 import json
 
 
@@ -72,20 +85,62 @@ class CSVUploadForm(forms.Form):
     csv_file = forms.FileField()
 
 
-class BankTransactionForm(forms.ModelForm):
-    balance = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
-    debit = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
-    credit = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
-    system_amount = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleFileField, self).clean(item, initial) for item in data]
+        return [super().clean(data, initial)]
+
+
+class StatementUploadForm(forms.Form):
+    """Bank statement files to import: CSV or XLSX files, or zip archives of them"""
+    files = MultipleFileField(help_text="Select one or more CSV or XLSX files, or a zip of the branch statement files.")
+    bank_profile = forms.ChoiceField(
+        choices=[('', "Detect from the header")] + PROFILE_CHOICES, required=False,
+        help_text="Column layout of the bank's export",
+    )
+
+    def clean_files(self):
+        files = self.cleaned_data['files']
+        for file in files:
+            if not file.name.lower().endswith(STATEMENT_FILE_EXTENSIONS + ('.zip',)):
+                raise forms.ValidationError(f"{file.name} is not a CSV, XLSX or zip file.")
+        return files
+
 
+class BankTransactionForm(forms.ModelForm):
     class Meta:
         model = BankStatement
         fields = '__all__'
 
 
 
+class ReconciledFilter(admin.SimpleListFilter):
+    """Deposits with or without a system voucher, the same test as the aging report and summary"""
+    title = "reconciliation"
+    parameter_name = 'reconciled'
+
+    def lookups(self, request, model_admin):
+        return [('no', "Unreconciled deposits"), ('yes', "Reconciled")]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'no':
+            return queryset & unreconciled_statements()
+        if self.value() == 'yes':
+            return queryset.filter(system_voucher_no__gt='')
+        return queryset
+
+
 @admin.register(BankStatement)
-class BankStatementAdmin(admin.ModelAdmin):
+class BankStatementAdmin(AuditedAdminMixin, BigTableMixin, admin.ModelAdmin):
 
     # Template for bulk upload csv
     change_list_template = "admin/bankstatement_changelist.html"
@@ -102,12 +157,46 @@ class BankStatementAdmin(admin.ModelAdmin):
         'created_by', 'bank_voucher', 'last_updated', 'created_date', 'export_action_link'
     )
 
-    list_filter = ('branch', 'source', 'bank_name', 'last_updated', 'created_date')
-    search_fields = ( 'policy_no', 'bank_transaction_detail','credit', 'bank_deposit_date', 'source','bank_account_no', 'system_voucher_no', 'balance', 'remarks', 'bank_name', 'bank_code')
+    list_filter = (
+        ReconciledFilter, 'branch', 'source', ('bank_name', CachedAllValuesFieldListFilter), 'last_updated', 'created_date',
+    )
+    # Filters of the aging report's drill-down links that have no sidebar filter
+    drill_down_lookups = ('bank_code__exact', 'bank_deposit_date__gte', 'bank_deposit_date__lte')
+    # Searched through the full-text index in get_search_results, these are the fallback;
+    # policy numbers are always looked up in StatementPolicy
+    search_fields = ('bank_transaction_detail', 'bank_deposit_date', 'source','bank_account_no', 'system_voucher_no', 'remarks', 'bank_name', 'bank_code')
+    list_select_related = ('modified_by', 'created_by')
     ordering = ('-created_date',)
     date_hierarchy = 'created_date'
     list_per_page = 50
 
+    def lookup_allowed(self, lookup, value, request=None):
+        return lookup in self.drill_down_lookups or super().lookup_allowed(lookup, value, request)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        if search_available(queryset.db):
+            return search_statements(queryset, search_term), False
+
+        # No full-text index on this database: LIKE search plus exact amounts and policy numbers
+        original = queryset
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        for exact in (amount_q(search_term), policy_q(search_term)):
+            if exact is not None:
+                queryset |= original.filter(exact)
+        return queryset, may_have_duplicates
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        # Totals of the filtered rows, summed by the database and cached like the row count
+        if hasattr(response, 'context_data') and 'cl' in response.context_data:
+            queryset = response.context_data['cl'].queryset
+            response.context_data['totals'] = cached_queryset_value(
+                queryset, 'totals', queryset.totals, self.count_cache_timeout,
+            )
+        return response
+
     def get_readonly_fields(self, request, obj=None):
         # List of fields to make read-only
         read_only_fields = [
@@ -142,7 +231,10 @@ class BankStatementAdmin(admin.ModelAdmin):
     )
 
     def save_model(self, request, obj, form, change):
-        if not obj.pk:
+        # AuditedAdminMixin records the changed fields
+        if change:
+            obj.modified_by = request.user
+        else:
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
 
@@ -165,200 +257,258 @@ class BankStatementAdmin(admin.ModelAdmin):
 
     export_action_link.short_description = "Export"
 
-    actions = ['export_selected_as_csv']
-
-    def get_export_data(self, queryset):
-        """Method to export the data"""
-        data = []
-        for obj in queryset:
-            data.append({
-                'Bank Code': obj.bank_code,
-                'Bank Name': obj.bank_name,
-                'Account No': obj.bank_account_no,
-                'Deposit Date': obj.bank_deposit_date,
-                'Transaction Detail': obj.bank_transaction_detail,
-                'Debit': obj.debit,
-                'Credit': obj.credit,
-                'Balance': obj.balance,
-                'Voucher No': obj.system_voucher_no,
-                'System Amount': obj.system_amount,
-                'Policy No': str(obj.policy_no),
-                'Remarks': obj.remarks,
-                'Branch': obj.branch,
-                'Source': obj.source,
-                'Created By': str(obj.created_by),
-                'Created Date': obj.created_date,
-                'Last Updated': obj.last_updated,
-            })
-        return data
+    actions = ['export_selected_as_csv', 'export_for_bulk_edit']
 
     def export_selected_as_csv(self, request, queryset):
         return self.export_as_csv_response(queryset, filename="BankReconcillation.csv")
 
     def export_as_csv_response(self, queryset, filename):
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename={filename}'
-        response.write('\ufeff')  # UTF-8 BOM
-
-        data = self.get_export_data(queryset)
-        if not data:
-            return response
-
-        writer = csv.DictWriter(response, fieldnames=data[0].keys(), quoting=csv.QUOTE_ALL)
-        writer.writeheader()
-        for row in data:
-            writer.writerow(row)
-        return response
+        return export_statements(queryset, filename)
 
     export_selected_as_csv.short_description = "Export selected as CSV"
 
+    def export_for_bulk_edit(self, request, queryset):
+        return export_bulk_edit_csv(queryset)
+
+    export_for_bulk_edit.short_description = "Export selected for bulk edit"
+
     def export_single_record(self, request, object_id):
         queryset = self.get_queryset(request).filter(pk=object_id)
         return self.export_as_csv_response(queryset, filename="bank_statement.csv")
 
-    def save_model(self, request, obj, form, change):
-        if change:
-            obj.modified_by = request.user  # ✅ set current user
-            old_instance = copy.deepcopy(BankStatement.objects.get(pk=obj.pk))
-
-        super().save_model(request, obj, form, change)
-
-        if change:
-            BankStatementChangeHistory.objects.create(
-                bank_statement=obj,
-                bank_code=old_instance.bank_code,
-                bank_name=old_instance.bank_name,
-                bank_account_no=old_instance.bank_account_no,
-                bank_deposit_date=old_instance.bank_deposit_date,
-                balance=old_instance.balance,
-                bank_transaction_detail=old_instance.bank_transaction_detail,
-                debit=old_instance.debit,
-                credit=old_instance.credit,
-                system_voucher_no=old_instance.system_voucher_no,
-                system_amount=old_instance.system_amount,
-                policy_no=old_instance.policy_no,
-                remarks=old_instance.remarks,
-                branch=old_instance.branch,
-                source=old_instance.source,
-                changed_by=request.user,  # ✅ current admin user
-                changed_at=timezone.now(),
-                action='UPDATE'
-            )
-
-    def delete_model(self, request, obj):
-        old_instance = copy.deepcopy(obj)
-
-        BankStatementChangeHistory.objects.create(
-            bank_statement=obj,
-            bank_code=old_instance.bank_code,
-            bank_name=old_instance.bank_name,
-            bank_account_no=old_instance.bank_account_no,
-            bank_deposit_date=old_instance.bank_deposit_date,
-            balance=old_instance.balance,
-            bank_transaction_detail=old_instance.bank_transaction_detail,
-            debit=old_instance.debit,
-            credit=old_instance.credit,
-            system_voucher_no=old_instance.system_voucher_no,
-            system_amount=old_instance.system_amount,
-            policy_no=old_instance.policy_no,
-            remarks=old_instance.remarks,
-            branch=old_instance.branch,
-            source=old_instance.source,
-            changed_by=request.user,  # ✅ current admin user
-            changed_at=timezone.now(),
-            action='DELETE'
-        )
-
-        super().delete_model(request, obj)
-
-
-
-
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
-            path("upload-csv/", self.upload_csv, name="bankstatement_upload_csv"),
+            path("upload-csv/", self.admin_site.admin_view(self.upload_csv), name="bankstatement_upload_csv"),
+            path("bulk-edit/", self.admin_site.admin_view(self.bulk_edit), name="bankstatement_bulk_edit"),
+            path("aging/", self.admin_site.admin_view(self.aging_report), name="bankstatement_aging_report"),
+            path("import-jobs/<int:job_id>/", self.admin_site.admin_view(self.import_job_status),
+                 name="bankstatement_import_status"),
+            path("import-jobs/<int:job_id>/progress/", self.admin_site.admin_view(self.import_job_progress),
+                 name="bankstatement_import_progress"),
             path("<path:object_id>/export/", self.export_single_record, name="bankstatement_export_single"),
         ]
         return custom_urls + urls
 
     def upload_csv(self, request):
-        """Function for handling CSV upload and insert data in BankStatement model"""
+        """Queue uploaded statement files, or the files of uploaded zips, for the process_statement_imports worker"""
         if request.method == "POST":
-            form = CSVUploadForm(request.POST, request.FILES)
+            form = StatementUploadForm(request.POST, request.FILES)
             if form.is_valid():
-                file = form.cleaned_data['csv_file']
                 try:
-                    decoded_file = file.read().decode('utf-8-sig')
-                    reader = csv.DictReader(io.StringIO(decoded_file))
-
-                    count_created = 0
-                    count_skipped = 0
-
-                    for row in reader:
-                        bank_code = row['bank_code'].strip()
-                        bank_name = row['bank_name'].strip()
-                        bank_account_no = row['bank_account_no'].strip()
-                        bank_deposit_date = datetime.strptime(row['bank_deposit_date'].strip(), '%Y-%m-%d').date()
-                        bank_transaction_detail = row['bank_transaction_detail'].strip()
-                        debit = float(row.get('debit', 0) or 0)
-                        credit = float(row.get('credit', 0) or 0)
-                        balance = float(row.get('balance', 0) or 0)
-
-                        exists = BankStatement.objects.filter(
-                            bank_code=bank_code,
-                            bank_deposit_date=bank_deposit_date,
-                            credit=credit,
-                            balance=balance
-                        ).exists()
-
-                        if exists:
-
-                            count_skipped += 1
-                            continue
-
-                        BankStatement.objects.create(
-                            bank_code=bank_code,
-                            bank_name=bank_name,
-                            bank_account_no=bank_account_no,
-                            bank_deposit_date=bank_deposit_date,
-                            bank_transaction_detail = bank_transaction_detail,
-                            debit=debit,
-                            credit=credit,
-                            balance=balance,
-                            created_by=request.user
-                        )
-                        count_created += 1
-
+                    files = [item for upload in form.cleaned_data['files'] for item in iter_upload_files(upload)]
+                except (zipfile.BadZipFile, ValueError) as exc:
+                    form.add_error('files', str(exc))
+                else:
+                    return self.queue_uploads(request, files, form.cleaned_data['bank_profile'])
+        else:
+            form = StatementUploadForm()
 
+        return render(request, "admin/csv_upload_form.html", {"form": form})
 
+    def queue_uploads(self, request, files, profile):
+        jobs, duplicates = queue_statement_files(files, request.user, profile)
+        for name, earlier in duplicates:
+            self.message_user(
+                request,
+                f"{name} is identical to the file of import job #{earlier.pk}; it was not imported again.",
+                messages.WARNING
+            )
+        if not jobs:
+            earlier = duplicates[0][1] if len(duplicates) == 1 else None
+            if earlier and (request.user.is_superuser or earlier.created_by_id == request.user.pk):
+                return redirect(reverse('admin:bankstatement_import_status', args=[earlier.pk]))
+            return redirect(reverse('admin:statement_tracker_bankstatement_changelist'))
+        if len(jobs) == 1:
+            self.message_user(request, f"Upload queued as import job #{jobs[0].pk}.", messages.SUCCESS)
+            return redirect(reverse('admin:bankstatement_import_status', args=[jobs[0].pk]))
+        self.message_user(request, f"{len(jobs)} files queued for import.", messages.SUCCESS)
+        # The job list shows created, skipped and failed rows and the duration per file
+        ids = ','.join(str(job.pk) for job in jobs)
+        return redirect(f"{reverse('admin:statement_tracker_statementimportjob_changelist')}?id__in={ids}")
+
+    def bulk_edit(self, request):
+        """Apply an edited export_for_bulk_edit file, all rows or none"""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        errors, error_count = [], 0
+        if request.method == "POST":
+            form = CSVUploadForm(request.POST, request.FILES)
+            if form.is_valid():
+                try:
+                    edits = parse_bulk_edit_csv(form.cleaned_data['csv_file'])
+                except BulkEditError as exc:
+                    errors, error_count = exc.errors, exc.error_count
+                else:
+                    updated = apply_bulk_edits(edits, request.user)
                     self.message_user(
                         request,
-                        f"CSV upload complete: {count_created} created, {count_skipped} skipped (duplicates).",
+                        f"Bulk edit applied: {updated} statement(s) changed, {len(edits) - updated} unchanged.",
                         messages.SUCCESS
                     )
-                    return redirect("..")
-                except Exception as e:
-                    print(e)
-                    self.message_user(request, f"Error: {str(e)}", messages.ERROR)
-
+                    return redirect(reverse('admin:statement_tracker_bankstatement_changelist'))
         else:
             form = CSVUploadForm()
 
-        return render(request, "admin/csv_upload_form.html", {"form": form})
+        context = dict(
+            self.admin_site.each_context(request),
+            title="Bulk edit bank statements",
+            form=form,
+            errors=errors,
+            error_count=error_count,
+            fields=BULK_EDIT_FIELDS,
+        )
+        return render(request, "admin/statement_bulk_edit.html", context)
+
+    def aging_link(self, branch, bank_code, date_from=None, date_to=None):
+        """Changelist of the unreconciled deposits behind one cell of the aging report"""
+        params = {'reconciled': 'no', 'bank_code__exact': bank_code}
+        if branch is None:
+            params['branch__isnull'] = 'True'
+        else:
+            params['branch__exact'] = branch
+        if date_from:
+            params['bank_deposit_date__gte'] = date_from.isoformat()
+        if date_to:
+            params['bank_deposit_date__lte'] = date_to.isoformat()
+        return f"{reverse('admin:statement_tracker_bankstatement_changelist')}?{urlencode(params)}"
+
+    def aging_report(self, request):
+        """Unreconciled deposits per branch, bank and age, as a page or with ?export=csv as CSV"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        if request.GET.get('refresh'):
+            invalidate_aging_report()
+            return redirect(reverse('admin:bankstatement_aging_report'))
+        report = aging_report()
+        if request.GET.get('export') == 'csv':
+            return export_aging_report(report)
+        for row in report['rows']:
+            row['url'] = self.aging_link(row['branch'], row['bank_code'])
+            for bucket in row['buckets']:
+                bucket['url'] = self.aging_link(row['branch'], row['bank_code'], bucket['date_from'], bucket['date_to'])
+        context = dict(
+            self.admin_site.each_context(request),
+            title="Unreconciled deposit aging",
+            report=report,
+        )
+        return render(request, "admin/statement_aging_report.html", context)
+
+    def get_import_job(self, request, job_id):
+        jobs = StatementImportJob.objects.all()
+        if not request.user.is_superuser:
+            jobs = jobs.filter(created_by=request.user)
+        return get_object_or_404(jobs, pk=job_id)
+
+    def import_job_status(self, request, job_id):
+        """Progress page of an import job"""
+        job = self.get_import_job(request, job_id)
+        context = dict(
+            self.admin_site.each_context(request),
+            title=f"Import job #{job.pk}",
+            job=job,
+        )
+        return render(request, "admin/statement_import_status.html", context)
+
+    def import_job_progress(self, request, job_id):
+        """Counters of an import job as JSON, polled by the progress page"""
+        job = self.get_import_job(request, job_id)
+        return JsonResponse(job.progress())
+
+
+
+@admin.register(StatementImportJob)
+class StatementImportJobAdmin(admin.ModelAdmin):
+    """Read-only view of queued and finished statement uploads"""
 
+    list_display = (
+        'id', 'original_name', 'status', 'rows_parsed', 'rows_inserted',
+        'rows_skipped', 'rows_failed', 'balance_breaks', 'rows_per_second', 'duration', 'created_by', 'created_date', 'finished_at',
+        'progress_link', 'rejects_link'
+    )
+    list_filter = ('status', 'created_date')
+    search_fields = ('original_name', 'created_by__username')
+    readonly_fields = [f.name for f in StatementImportJob._meta.fields]
+    list_select_related = ('created_by',)
+
+    def progress_link(self, obj):
+        url = reverse('admin:bankstatement_import_status', args=[obj.pk])
+        return format_html('<a href="{}">Progress</a>', url)
+
+    progress_link.short_description = "Progress"
+
+    def duration(self, obj):
+        if not (obj.started_at and obj.finished_at):
+            return "-"
+        return f"{(obj.finished_at - obj.started_at).total_seconds():.1f}s"
+
+    duration.short_description = "Duration"
+
+    def rejects_link(self, obj):
+        if not obj.rejects_file:
+            return "-"
+        return format_html('<a href="{}">Rejected rows</a>', obj.rejects_file.url)
+
+    rejects_link.short_description = "Rejects"
+
+    def has_add_permission(self, request):
+        # Jobs are created by the bank statement CSV upload
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyStatementSummary)
+class DailyStatementSummaryAdmin(ExportMixin, admin.ModelAdmin):
+    """
+    Read-only daily totals per bank, branch and source. Filtered to a month with the
+    date hierarchy and exported, it is the month-end report.
+    """
+    change_list_template = "admin/statement_summary_changelist.html"
+    list_display = (
+        'bank_deposit_date', 'bank_code', 'branch', 'source', 'row_count', 'reconciled_count', 'deposit_count',
+        'unreconciled_count', 'credit_total', 'unreconciled_credit', 'debit_total',
+    )
+    list_filter = ('bank_code', 'branch', 'source')
+    date_hierarchy = 'bank_deposit_date'
+    list_per_page = 100
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        if hasattr(response, 'context_data') and 'cl' in response.context_data:
+            response.context_data['totals'] = response.context_data['cl'].queryset.aggregate(
+                rows=Sum('row_count'), reconciled=Sum('reconciled_count'),
+                credit=Sum('credit_total'), debit=Sum('debit_total'),
+            )
+        return response
+
+    def has_add_permission(self, request):
+        # Maintained from the bank statements, see statement_tracker.summary
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(BankStatementChangeHistory)
-class BankStatementChangeHistoryAdmin(admin.ModelAdmin):
-    """Django admin for Log audit for BankStatementChangeHistory. model"""
+class BankStatementChangeHistoryAdmin(BigTableMixin, admin.ModelAdmin):
+    """Django admin for Log audit for BankStatementChangeHistory. model, edits since the audit trail are under Audit Entries"""
 
     list_display = (
         'bank_code', 'bank_name','changed_at', 'changed_by', 'policy_no',
-        'bank_code', 'bank_name', 'ban  k_account_no', 'bank_deposit_date',
+        'bank_code', 'bank_name', 'bank_account_no', 'bank_deposit_date',
         'balance', 'debit', 'credit', 'branch', 'source', 'action'
     )
-    list_filter = ('changed_at', 'changed_by', 'bank_code', 'bank_name')
+    list_filter = (
+        'changed_at', 'changed_by',
+        ('bank_code', CachedAllValuesFieldListFilter), ('bank_name', CachedAllValuesFieldListFilter),
+    )
+    # __str__ reads the statement, e.g. for the action checkboxes
+    list_select_related = ('changed_by', 'bank_statement')
     search_fields = ('bank_statement__bank_code', 'bank_statement__bank_name', 'changed_by__username')
     readonly_fields = (
         'bank_statement', 'changed_at', 'changed_by',
@@ -383,56 +533,16 @@ class BankStatementChangeHistoryAdmin(admin.ModelAdmin):
         return self.export_as_csv_response(queryset, filename="ReconcillationEditedHistory.csv")
 
     def export_as_csv_response(self, queryset, filename):
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename={filename}'
-        response.write('\ufeff')  # UTF-8 BOM
-
-        data = self.get_export_data(queryset)
-        if not data:
-            return response
-
-        writer = csv.DictWriter(response, fieldnames=data[0].keys(), quoting=csv.QUOTE_ALL)
-        writer.writeheader()
-        for row in data:
-            writer.writerow(row)
-        return response
-
-
-    def get_export_data(self, queryset):
-        """Method to export the data"""
-        data = []
-        for obj in queryset:
-            data.append({
-                'Bank Code': obj.bank_code,
-                'Bank Name': obj.bank_name,
-                'Account No': obj.bank_account_no,
-                'Deposit Date': obj.bank_deposit_date,
-                'Transaction Detail': obj.bank_transaction_detail,
-                'Debit': obj.debit,
-                'Credit': obj.credit,
-                'Balance': obj.balance,
-                'Voucher No': obj.system_voucher_no,
-                'System Amount': obj.system_amount,
-                'Policy No': str(obj.policy_no),
-                'Remarks': obj.remarks,
-                'Branch': obj.branch,
-                'Source': obj.source,
-                'Changed By': str(obj.changed_by),
-                'Created Date': obj.changed_at,
-                'action': obj.action
-            })
-        return data
-
-
-
+        return export_change_history(queryset, filename)
 
 
 @admin.register(LogEntry)
-class LogEntryAdmin(admin.ModelAdmin):
+class LogEntryAdmin(BigTableMixin, admin.ModelAdmin):
     list_display = [
         'action_time', 'user', 'content_type', 'object_link', 'action_type', 'display_changes'
     ]
     list_filter = ['action_flag', 'user', 'content_type']
+    list_select_related = ['user', 'content_type']
     search_fields = ['object_repr', 'change_message']
     readonly_fields = [f.name for f in LogEntry._meta.fields]
 
@@ -0,0 +1,132 @@
+"""
+Aging of unreconciled deposits: bank credits without a system voucher, per branch,
+bank and age bucket of their deposit date.
+
+The buckets are summed by the database in one GROUP BY with a conditional COUNT and
+SUM per bucket, so only one row per branch and bank comes back. The report is cached
+per day; the ages only change at midnight, reconciliations of the day show up the
+next day or after invalidate_aging_report().
+
+    report = aging_report()
+    report['rows'][0]['buckets'][0]   # {'count': 12, 'credit': Decimal('50400.00'), 'date_from': ..., 'date_to': ...}
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from rjbcl.admin_export import stream_csv_response
+from .models import BankStatement
+from .reconciliation import unreconciled_statements
+
+CACHE_PREFIX = 'aging'
+
+# (label, fewest days, most days) since the deposit; deposits dated ahead count as 0 days
+AGE_BUCKETS = (
+    ('0-7 days', 0, 7),
+    ('8-30 days', 8, 30),
+    ('31-90 days', 31, 90),
+    ('90+ days', 91, None),
+)
+
+REPORT_TIMEOUT = 24 * 60 * 60
+
+
+def bucket_dates(today, min_days, max_days):
+    """The deposit dates of a bucket as (first, last), None for an open end"""
+    first = today - timedelta(days=max_days) if max_days is not None else None
+    last = today - timedelta(days=min_days) if min_days else None
+    return first, last
+
+
+def bucket_q(today, min_days, max_days):
+    first, last = bucket_dates(today, min_days, max_days)
+    condition = Q()
+    if first is not None:
+        condition &= Q(bank_deposit_date__gte=first)
+    if last is not None:
+        condition &= Q(bank_deposit_date__lte=last)
+    return condition
+
+
+def compute_aging_report(today=None):
+    """
+    {'rows': [...], 'totals': {...}} of the unreconciled deposits as of `today`; each row
+    holds its branch, bank and a bucket per AGE_BUCKETS with count, credit and dates.
+    """
+    today = today or timezone.localdate()
+    aggregates = {}
+    for index, (label, min_days, max_days) in enumerate(AGE_BUCKETS):
+        condition = bucket_q(today, min_days, max_days)
+        aggregates[f'count_{index}'] = Count('pk', filter=condition)
+        aggregates[f'credit_{index}'] = Sum('credit', filter=condition)
+    rows = unreconciled_statements().order_by('branch', 'bank_code').values('branch', 'bank_code').annotate(
+        total_count=Count('pk'), total_credit=Sum('credit'), **aggregates,
+    )
+
+    branches = dict(BankStatement.BRANCH_CHOICES)
+    dates = [bucket_dates(today, min_days, max_days) for label, min_days, max_days in AGE_BUCKETS]
+    totals = {'count': 0, 'credit': 0, 'buckets': [{'count': 0, 'credit': 0} for _ in AGE_BUCKETS]}
+    report_rows = []
+    for row in rows:
+        buckets = [
+            {
+                'count': row[f'count_{index}'], 'credit': row[f'credit_{index}'] or 0,
+                'date_from': date_from, 'date_to': date_to,
+            }
+            for index, (date_from, date_to) in enumerate(dates)
+        ]
+        report_rows.append({
+            'branch': row['branch'],
+            'branch_label': branches.get(row['branch'], row['branch'] or "No branch"),
+            'bank_code': row['bank_code'],
+            'count': row['total_count'],
+            'credit': row['total_credit'] or 0,
+            'buckets': buckets,
+        })
+        totals['count'] += row['total_count']
+        totals['credit'] += row['total_credit'] or 0
+        for total, bucket in zip(totals['buckets'], buckets):
+            total['count'] += bucket['count']
+            total['credit'] += bucket['credit']
+    return {
+        'as_of': today,
+        'buckets': [label for label, min_days, max_days in AGE_BUCKETS],
+        'rows': report_rows,
+        'totals': totals,
+        'generated_at': timezone.now(),
+    }
+
+
+def aging_report_key(today):
+    return f"{CACHE_PREFIX}:report:{today.isoformat()}"
+
+
+def aging_report():
+    """Today's report, computed once a day and then read from the cache"""
+    today = timezone.localdate()
+    return cache.get_or_set(aging_report_key(today), lambda: compute_aging_report(today), REPORT_TIMEOUT)
+
+
+def invalidate_aging_report():
+    cache.delete(aging_report_key(timezone.localdate()))
+
+
+def export_aging_report(report, filename=None):
+    """The report as CSV: a line per branch and bank with the count and credit of every bucket"""
+    headers = ['Branch', 'Bank Code']
+    for label in report['buckets']:
+        headers += [f'{label} count', f'{label} credit']
+    headers += ['Total count', 'Total credit']
+
+    def rows():
+        yield headers
+        for row in report['rows']:
+            values = [row['branch_label'], row['bank_code']]
+            for bucket in row['buckets']:
+                values += [bucket['count'], bucket['credit']]
+            yield values + [row['count'], row['credit']]
+
+    filename = filename or f"unreconciled_aging_{report['as_of'].isoformat()}.csv"
+    return stream_csv_response(rows(), filename)
@@ -1,4 +1,10 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def create_search_index(sender, using, **kwargs):
+    from .search import ensure_search_index
+    ensure_search_index(using)
 
 
 class StatementTrackerConfig(AppConfig):
@@ -6,3 +12,9 @@ class StatementTrackerConfig(AppConfig):
     name = 'statement_tracker'
     verbose_name = '5_Bank and System Reconcillation'  # Change this to your desired name
 
+    def ready(self):
+        # Full-text index of BankStatement, see statement_tracker.search
+        post_migrate.connect(create_search_index, sender=self)
+        # Drop cached dashboard widgets when the models behind them change
+        from .dashboard import connect_invalidation
+        connect_invalidation()
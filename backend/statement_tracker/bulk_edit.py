@@ -0,0 +1,163 @@
+"""
+Bulk reconciliation edits: a CSV keyed by statement id sets the reconciliation
+columns of many statements at once.
+
+Clerks export the selected statements with export_bulk_edit_csv(), fill in the
+columns and upload the file. The whole file is validated first; only a file
+without errors is applied, with bulk_update in one transaction and one audit entry
+per changed statement.
+"""
+import csv
+import io
+from decimal import InvalidOperation
+from itertools import chain
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from audit.engine import audit_entry, plain, record
+from rjbcl.admin_export import EXPORT_CHUNK_SIZE, stream_csv_response
+from .importer import iter_chunks, parse_amount
+from .models import BankStatement
+from .policies import sync_policies
+from .summary import SummaryDelta, summary_values
+
+# Columns a bulk edit may change
+BULK_EDIT_FIELDS = ('system_voucher_no', 'system_amount', 'policy_no', 'branch', 'source')
+
+# Exported for reference, ignored on upload
+REFERENCE_FIELDS = ('bank_code', 'bank_account_no', 'bank_deposit_date', 'bank_transaction_detail', 'credit')
+
+UPDATE_BATCH_SIZE = 500
+
+# Errors listed back to the user, the rest are only counted
+MAX_REPORTED_ERRORS = 50
+
+
+class BulkEditError(Exception):
+    def __init__(self, errors, error_count):
+        super().__init__(f"{error_count} error(s) in the bulk edit file")
+        self.errors = errors
+        self.error_count = error_count
+
+
+def export_bulk_edit_csv(queryset, filename="bank_statement_bulk_edit.csv"):
+    """Current values of the editable columns, keyed by id, as a template to edit"""
+    fields = ('id',) + BULK_EDIT_FIELDS + REFERENCE_FIELDS
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return stream_csv_response(chain([fields], rows), filename)
+
+
+def clean_value(field_name, raw):
+    """Validate one cell against the model field: choices, max_length, required"""
+    field = BankStatement._meta.get_field(field_name)
+    value = raw.strip()
+    if field.get_internal_type() == 'DecimalField':
+        value = parse_amount(value) if value else None
+    elif not value and field.null:
+        value = None
+    return field.clean(value, None)
+
+
+def parse_bulk_edit_csv(file):
+    """
+    Read an uploaded edit file (binary) into {id: {field: value}} for the
+    BULK_EDIT_FIELDS present in its header. Raises BulkEditError listing bad rows.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    edits, errors, error_count = {}, [], 0
+
+    def error(message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(message)
+
+    try:
+        reader = csv.DictReader(text)
+        header = reader.fieldnames or []
+        fields = [field for field in BULK_EDIT_FIELDS if field in header]
+        if 'id' not in header or not fields:
+            raise BulkEditError([f"The file needs an id column and at least one of: {', '.join(BULK_EDIT_FIELDS)}"], 1)
+
+        for line_no, row in enumerate(reader, start=2):
+            try:
+                pk = int(row['id'])
+            except (TypeError, ValueError):
+                error(f"Line {line_no}: invalid id {row['id']!r}")
+                continue
+            if pk in edits:
+                error(f"Line {line_no}: statement {pk} appears more than once")
+                continue
+            values = {}
+            for field in fields:
+                try:
+                    values[field] = clean_value(field, row[field] or '')
+                except ValidationError as exc:
+                    error(f"Line {line_no}, {field}: {' '.join(exc.messages)}")
+                except (InvalidOperation, ValueError):
+                    error(f"Line {line_no}, {field}: invalid amount {row[field]!r}")
+            edits[pk] = values
+    finally:
+        text.detach()
+
+    for pks in iter_chunks(sorted(edits), UPDATE_BATCH_SIZE):
+        found = set(BankStatement.objects.filter(pk__in=pks).values_list('pk', flat=True))
+        for pk in pks:
+            if pk not in found:
+                error(f"Statement {pk} does not exist")
+    if error_count:
+        raise BulkEditError(errors, error_count)
+    return edits
+
+
+def apply_bulk_edits(edits, user):
+    """
+    Apply {id: {field: value}} in one transaction with bulk_update, and record one
+    audit entry per changed statement with a single bulk_create. Returns how many changed.
+    """
+    now = timezone.now()
+    entries, updated = [], 0
+    delta = SummaryDelta()
+    with transaction.atomic():
+        for pks in iter_chunks(sorted(edits), UPDATE_BATCH_SIZE):
+            changed = []
+            for obj in BankStatement.objects.select_for_update().filter(pk__in=pks):
+                changes = {}
+                for field, value in edits[obj.pk].items():
+                    old, new = plain(getattr(obj, field)), plain(value)
+                    # Empty cells are stored as NULL, older rows may hold ''
+                    if old != new and (old or new):
+                        changes[field] = [old, new]
+                    setattr(obj, field, value)
+                if changes:
+                    changed.append(obj)
+                    entries.append(audit_entry(obj, 'UPDATE', user, changes, changed_at=now))
+                    # branch, source and the voucher decide the summary row and its reconciled count
+                    delta.remove(obj._summary_values)
+                    delta.add(summary_values(obj))
+            if changed:
+                fields = list(edits[changed[0].pk])
+                _update_statements(changed, fields, user, now)
+                if 'policy_no' in fields:
+                    sync_policies([(obj.pk, obj.policy_no) for obj in changed])
+                updated += len(changed)
+        record(entries)
+        delta.apply()
+    return updated
+
+
+def _update_statements(statements, fields, user, now):
+    """
+    Save `fields` of `statements`. A column that gets the same value on every row, like
+    a branch or source set for a whole batch, is one plain UPDATE; only columns whose
+    values differ per row go through bulk_update's CASE expressions.
+    """
+    varying = [field for field in fields if len({plain(getattr(obj, field)) for obj in statements}) > 1]
+    uniform = {field: getattr(statements[0], field) for field in fields if field not in varying}
+    if varying:
+        BankStatement.objects.bulk_update(statements, varying)
+    BankStatement.objects.filter(pk__in=[obj.pk for obj in statements]).update(
+        modified_by=user, last_updated=now, **uniform,
+    )
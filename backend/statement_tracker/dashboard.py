@@ -0,0 +1,210 @@
+"""
+Operations dashboard.
+
+Each widget is one aggregate query, over DailyStatementSummary for the statements and
+over indexed filters for the smaller tables, cached under its own key for its TTL.
+Writes delete the keys of the widgets they change once their transaction commits:
+SummaryDelta for the statements, post_save and post_delete for the other models (see
+connect_invalidation). Queryset updates send no signals; the TTL bounds how stale a
+widget gets after one.
+
+    dashboard_data()                          # every widget, one cache round trip
+    get_widget('overdue_tickets')
+    invalidate_widgets('open_change_requests')
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from assets_manager.models import ITAsset
+from rjbcl_workflow_manager.models import ChangeRequest
+from ticket.models import Ticket
+from user_request_app.models import UserRequest
+from .models import UNDATED, DailyStatementSummary
+
+CACHE_PREFIX = 'dashboard'
+
+# Change request statuses that still need someone to act
+OPEN_CHANGE_REQUEST_STATUSES = ('SUBMITTED', 'UNDER_REVIEW', 'APPROVED', 'IN_PROGRESS', 'PENDING_INFO', 'ON_HOLD')
+
+# Ticket statuses whose SLA still runs
+OPEN_TICKET_STATUSES = ('Open', 'In Progress', 'Pending Customer', 'Pending Third Party', 'Reopened', 'Transferred')
+
+# ITAsset.amc_expiry_date is alerted this many days ahead
+AMC_ALERT_DAYS = 30
+
+# Rows listed by the widgets that show individual records
+WIDGET_LIST_SIZE = 10
+
+
+class Widget:
+    """A cached dashboard metric; `models` are the 'app_label.Model' whose writes invalidate it"""
+
+    def __init__(self, name, title, compute, timeout, models=()):
+        self.name = name
+        self.title = title
+        self.compute = compute
+        self.timeout = timeout
+        self.models = models
+
+
+WIDGETS = {}
+
+
+def widget(name, title, timeout, models=()):
+    def register(compute):
+        WIDGETS[name] = Widget(name, title, compute, timeout, models)
+        return compute
+    return register
+
+
+def widget_key(name):
+    # Per day, so the date based widgets start over at midnight
+    return f"{CACHE_PREFIX}:{name}:{timezone.localdate().isoformat()}"
+
+
+@widget('unreconciled_statements', "Unreconciled statements", timeout=600)
+def unreconciled_statements():
+    """Deposits without a system voucher per bank, from the daily summary"""
+    rows = list(
+        DailyStatementSummary.objects.order_by('bank_code')
+        .filter(deposit_count__gt=F('reconciled_deposit_count'))
+        .exclude(bank_deposit_date=UNDATED)
+        .values('bank_code')
+        .annotate(
+            count=Sum(F('deposit_count') - F('reconciled_deposit_count')),
+            credit=Sum(F('credit_total') - F('reconciled_credit')),
+            oldest=Min('bank_deposit_date'),
+        )
+    )
+    return {
+        'banks': rows,
+        'count': sum(row['count'] for row in rows),
+        'credit': sum(row['credit'] for row in rows),
+    }
+
+
+@widget('open_change_requests', "Open change requests", timeout=300, models=('rjbcl_workflow_manager.ChangeRequest',))
+def open_change_requests():
+    """Open change requests per receiving department and status"""
+    labels = dict(ChangeRequest.STATUS_CHOICES)
+    rows = (
+        ChangeRequest.objects.order_by()
+        .filter(status__in=OPEN_CHANGE_REQUEST_STATUSES)
+        .values('to_department__name', 'status')
+        .annotate(count=Count('id'))
+    )
+    departments, by_status = {}, dict.fromkeys(OPEN_CHANGE_REQUEST_STATUSES, 0)
+    for row in rows:
+        counts = departments.setdefault(row['to_department__name'], dict.fromkeys(OPEN_CHANGE_REQUEST_STATUSES, 0))
+        counts[row['status']] = row['count']
+        by_status[row['status']] += row['count']
+    return {
+        'statuses': [{'status': status, 'label': labels[status]} for status in OPEN_CHANGE_REQUEST_STATUSES],
+        'departments': [
+            {'department': name, 'counts': list(counts.values()), 'total': sum(counts.values())}
+            for name, counts in sorted(departments.items())
+        ],
+        'by_status': list(by_status.values()),
+        'total': sum(by_status.values()),
+    }
+
+
+@widget('overdue_tickets', "Overdue tickets", timeout=60, models=('ticket.Ticket',))
+def overdue_tickets():
+    """Open tickets past their SLA due date, most overdue first"""
+    now = timezone.now()
+    overdue = Ticket.objects.filter(current_status__in=OPEN_TICKET_STATUSES, sla_due_date__lt=now)
+    departments = list(
+        overdue.order_by('department__name').values('department__name').annotate(count=Count('id'))
+    )
+    tickets = list(
+        overdue.order_by('sla_due_date')
+        .values('ticket_number', 'title', 'department__name', 'current_status', 'sla_due_date')[:WIDGET_LIST_SIZE]
+    )
+    for ticket in tickets:
+        ticket['hours_overdue'] = int((now - ticket['sla_due_date']).total_seconds() // 3600)
+    return {
+        'count': sum(row['count'] for row in departments),
+        'departments': departments,
+        'tickets': tickets,
+    }
+
+
+@widget('expiring_amcs', "Expiring AMCs and licenses", timeout=3600, models=('assets_manager.ITAsset',))
+def expiring_amcs():
+    """Assets in use whose AMC or license expires within AMC_ALERT_DAYS, or has expired"""
+    today = timezone.localdate()
+    assets = ITAsset.objects.exclude(status__in=('RETIRED', 'LOST')).filter(
+        amc_expiry_date__lte=today + timedelta(days=AMC_ALERT_DAYS),
+    )
+    counts = assets.aggregate(
+        expired=Count('id', filter=Q(amc_expiry_date__lt=today)),
+        expiring=Count('id', filter=Q(amc_expiry_date__gte=today)),
+    )
+    upcoming = list(
+        assets.filter(amc_expiry_date__gte=today).order_by('amc_expiry_date')
+        .values('asset_tag', 'name', 'department', 'amc_expiry_date')[:WIDGET_LIST_SIZE]
+    )
+    for asset in upcoming:
+        asset['days_remaining'] = (asset['amc_expiry_date'] - today).days
+    return dict(counts, days=AMC_ALERT_DAYS, assets=upcoming)
+
+
+@widget('pending_user_requests', "Pending user requests", timeout=300, models=('user_request_app.UserRequest',))
+def pending_user_requests():
+    """User access requests waiting for approval, per department"""
+    pending = UserRequest.objects.filter(status='Pending')
+    departments = list(
+        pending.order_by('department__name').values('department__name')
+        .annotate(count=Count('request_id'), oldest=Min('request_date'))
+    )
+    return {
+        'count': sum(row['count'] for row in departments),
+        'oldest': min((row['oldest'] for row in departments), default=None),
+        'departments': departments,
+    }
+
+
+def compute_widget(name):
+    return dict(WIDGETS[name].compute(), title=WIDGETS[name].title, generated_at=timezone.now())
+
+
+def dashboard_data(names=None):
+    """{name: data} of the widgets `names`, default all, read from the cache in one call"""
+    names = list(names or WIDGETS)
+    keys = {widget_key(name): name for name in names}
+    cached = cache.get_many(list(keys))
+    data = {keys[key]: value for key, value in cached.items()}
+    for name in names:
+        if name not in data:
+            data[name] = compute_widget(name)
+            cache.set(widget_key(name), data[name], WIDGETS[name].timeout)
+    return {name: data[name] for name in names}
+
+
+def get_widget(name):
+    """The cached data of widget `name`, computed and cached on a miss"""
+    return dashboard_data([name])[name]
+
+
+def invalidate_widgets(*names):
+    """Drop the cached data of `names` once the current transaction commits"""
+    keys = [widget_key(name) for name in names]
+    # Deleting before the commit would let a concurrent request cache the old values again
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _invalidate_model_widgets(sender, **kwargs):
+    invalidate_widgets(*[name for name, entry in WIDGETS.items() if sender._meta.label in entry.models])
+
+
+def connect_invalidation():
+    """Invalidate the widgets of a model on its saves and deletes; called from AppConfig.ready"""
+    for label in {label for entry in WIDGETS.values() for label in entry.models}:
+        post_save.connect(_invalidate_model_widgets, sender=label, dispatch_uid=f'dashboard_save_{label}')
+        post_delete.connect(_invalidate_model_widgets, sender=label, dispatch_uid=f'dashboard_delete_{label}')
@@ -0,0 +1,335 @@
+"""
+Streaming bulk import of bank statement CSV and XLSX files into BankStatement.
+
+Files are parsed by statement_parser, a chunk at a time, in the layout of the bank's
+export.
+
+Duplicates are found by the fingerprint of each line (see statement_fingerprint),
+one indexed lookup per chunk. An upload whose file hash matches an earlier import is
+not parsed at all.
+"""
+import csv
+import hashlib
+import io
+from decimal import Decimal
+from pathlib import Path
+from itertools import islice
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .continuity import check_continuity
+from .models import BankStatement, StatementImportJob, statement_fingerprint
+from .policies import sync_policies
+from .statement_parser import iter_statement_frames
+from .summary import SUMMARY_FIELDS, SummaryDelta
+
+# Rows per INSERT / duplicate lookup. Kept below SQLite's 999 bound parameter limit.
+IMPORT_CHUNK_SIZE = 500
+
+PAISA = Decimal('0.01')
+
+# Rows converted per DataFrame by the parser
+PARSE_CHUNK_SIZE = 5000
+
+# Bytes read at a time when hashing an uploaded file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Row errors kept on a job, the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+# Balance breaks listed on a job, the rest are only counted
+MAX_REPORTED_BREAKS = 20
+
+
+class ImportStats:
+    """Running counters of one import"""
+
+    def __init__(self):
+        self.parsed = 0
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+
+        self.rejects = []
+        # {(bank_code, bank_account_no): [first, last deposit date]} of the rows read
+        self.periods = {}
+
+    def add_period(self, values):
+        account, day = (values['bank_code'], values['bank_account_no']), values['bank_deposit_date']
+        if account[1] and day:
+            period = self.periods.setdefault(account, [day, day])
+            period[0], period[1] = min(period[0], day), max(period[1], day)
+
+    def add_reject(self, rejected):
+        self.failed += 1
+        self.rejects.append(rejected)
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Line {rejected.line_no}: {rejected.reason}")
+
+
+def parse_amount(value):
+    """Parse a bank amount such as "1,000.5" into a Decimal rounded to paisa"""
+    text = str(value or 0).replace(',', '').strip() or '0'
+    amount = Decimal(text)
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    return amount.quantize(PAISA)
+
+
+def iter_statement_rows(file, stats, profile=None):
+    """
+    Parse a binary statement export with the vectorized parser and yield the rows as
+    BankStatement field values. Bad rows are added to `stats` as rejects.
+    """
+    for rows in iter_statement_frames(file, stats, profile, chunk_size=PARSE_CHUNK_SIZE):
+        yield from rows
+
+
+def iter_chunks(iterable, size):
+    """Yield lists of at most `size` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def existing_fingerprints(fingerprints):
+    """Return which of `fingerprints` are already stored, using one query on the unique index"""
+    return set(BankStatement.objects.filter(fingerprint__in=fingerprints).values_list('fingerprint', flat=True))
+
+
+def insert_chunk(rows, user):
+    """
+    Insert the new rows of a chunk and return how many were created.
+
+    Every row of one chunk gets the same created_date stamp. A row that loses a race
+    against a concurrent upload is dropped by ignore_conflicts and the stored row keeps
+    the other upload's stamp, so reading our stamp back gives exactly the rows created;
+    they are added to DailyStatementSummary.
+    """
+    # Rows parsed by parallel_import arrive fingerprinted already
+    fingerprints = [values.get('fingerprint') or statement_fingerprint(values) for values in rows]
+    seen = existing_fingerprints(fingerprints)
+    new_rows = []
+    for fingerprint, values in zip(fingerprints, rows):
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        new_rows.append(dict(values, fingerprint=fingerprint))
+
+    if not new_rows:
+        return 0
+
+    stamp = timezone.now()
+    with transaction.atomic():
+        BankStatement.objects.bulk_create(
+            [BankStatement(created_by=user, created_date=stamp, **values) for values in new_rows],
+            ignore_conflicts=True,
+        )
+        # The rows that made it in, added to DailyStatementSummary in the same transaction
+        delta = SummaryDelta()
+        created = 0
+        for values in BankStatement.objects.filter(created_by=user, created_date=stamp).values(*SUMMARY_FIELDS):
+            delta.add(values)
+            created += 1
+        delta.apply()
+        if any(values.get('policy_no') for values in new_rows):
+            created_rows = BankStatement.objects.filter(created_by=user, created_date=stamp).exclude(policy_no=None)
+            sync_policies(created_rows.values_list('pk', 'policy_no'))
+        return created
+
+
+def import_statement_csv(file, user, profile=None, chunk_size=IMPORT_CHUNK_SIZE, on_progress=None):
+    """
+    Stream a bank statement CSV or XLSX file into BankStatement and return its ImportStats.
+
+    `profile` names the bank layout, see statement_parser.BANK_PROFILES; `on_progress(stats)`
+    is called after every chunk.
+    """
+    stats = ImportStats()
+    return insert_statement_rows(iter_statement_rows(file, stats, profile), user, stats, chunk_size, on_progress)
+
+
+def insert_statement_rows(rows, user, stats, chunk_size=IMPORT_CHUNK_SIZE, on_progress=None):
+    """Insert parsed rows chunk by chunk, adding the created and skipped counts to `stats`"""
+    for chunk in iter_chunks(rows, chunk_size):
+        for values in chunk:
+            stats.add_period(values)
+        chunk_created = insert_chunk(chunk, user)
+        stats.created += chunk_created
+        stats.skipped += len(chunk) - chunk_created
+        if on_progress:
+            on_progress(stats)
+    return stats
+
+
+def file_sha256(file):
+    """Hex SHA-256 of a binary file, read in blocks and rewound afterwards"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def find_imported_file(sha256, exclude_pk=None):
+    """The queued, running or completed import job of an identical file, or None"""
+    jobs = StatementImportJob.objects.filter(file_sha256=sha256, status__in=('QUEUED', 'RUNNING', 'COMPLETED'))
+    if exclude_pk is not None:
+        jobs = jobs.exclude(pk=exclude_pk)
+    return jobs.order_by('created_date').first()
+
+
+def queue_statement_files(files, user, profile=''):
+    """
+    Create an import job per (name, file) pair, skipping files identical to an earlier
+    or a sibling upload. Returns the new jobs and the (name, earlier job) pairs skipped.
+    """
+    jobs, duplicates = [], []
+    for name, file in files:
+        sha256 = file_sha256(file)
+        earlier = find_imported_file(sha256)
+        if earlier is not None:
+            duplicates.append((name, earlier))
+            continue
+        file.name = name
+        jobs.append(StatementImportJob.objects.create(
+            file=file, original_name=name, file_sha256=sha256, bank_profile=profile, created_by=user,
+        ))
+    return jobs, duplicates
+
+
+# Background jobs
+
+def _update_job(job, **fields):
+    # update() skips auto_now, so refresh the heartbeat by hand
+    fields['last_updated'] = timezone.now()
+    StatementImportJob.objects.filter(pk=job.pk).update(**fields)
+
+
+def _job_counters(stats):
+    return {
+        'rows_parsed': stats.parsed,
+        'rows_inserted': stats.created,
+        'rows_skipped': stats.skipped,
+        'rows_failed': stats.failed,
+        'error': '\n'.join(stats.errors),
+    }
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it, or None if the queue is empty"""
+    for job in StatementImportJob.objects.filter(status='QUEUED').order_by('created_date')[:10]:
+        if claim_job(job):
+            return job
+    return None
+
+
+def claim_job(job):
+    """Mark a queued job as running, False if another worker got it first"""
+    # The conditional UPDATE is the lock: only one worker sees a row count of 1
+    claimed = StatementImportJob.objects.filter(pk=job.pk, status='QUEUED').update(
+        status='RUNNING', started_at=timezone.now(), last_updated=timezone.now(),
+    )
+    if claimed:
+        job.refresh_from_db()
+    return bool(claimed)
+
+
+def requeue_stale_jobs(stale_after):
+    """
+    Put RUNNING jobs without a heartbeat for `stale_after` back in the queue.
+
+    Their worker was killed mid-file; re-running is safe because rows that were
+    already inserted are skipped as duplicates.
+    """
+    return StatementImportJob.objects.filter(
+        status='RUNNING', last_updated__lt=timezone.now() - stale_after,
+    ).update(status='QUEUED', last_updated=timezone.now())
+
+
+def complete_if_identical(job, sha256):
+    """
+    Complete a claimed job without importing when an earlier job has the same file.
+    Jobs queued before file hashes were recorded get theirs here.
+    """
+    if not job.file_sha256:
+        job.file_sha256 = sha256
+        _update_job(job, file_sha256=sha256)
+    earlier = find_imported_file(job.file_sha256, exclude_pk=job.pk)
+    if earlier is None or earlier.created_date > job.created_date:
+        return False
+    _update_job(
+        job, status='COMPLETED', finished_at=timezone.now(),
+        error=f"Identical to import job #{earlier.pk}, no rows imported",
+    )
+    return True
+
+
+def job_progress(job):
+    """on_progress callback that stores the counters on `job`"""
+    return lambda stats: _update_job(job, **_job_counters(stats))
+
+
+def rejects_csv(rejects):
+    """The rejected rows as CSV: line number and reason, then the row as it was in the file"""
+    columns = []
+    for rejected in rejects:
+        columns.extend(column for column in rejected.values if column not in columns)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['line', 'reason'] + columns)
+    for rejected in rejects:
+        writer.writerow([rejected.line_no, rejected.reason] + [rejected.values.get(column, '') for column in columns])
+    return '\ufeff' + output.getvalue()
+
+
+def check_imported_balances(stats):
+    """Running-balance breaks in the accounts and dates of an import, see statement_tracker.continuity"""
+    breaks = []
+    for (bank_code, account_no), (first, last) in stats.periods.items():
+        breaks.extend(check_continuity(first, last, [(bank_code, account_no)]).breaks)
+    return breaks
+
+
+def finish_import_job(job, stats):
+    fields = _job_counters(stats)
+    if stats.created:
+        breaks = check_imported_balances(stats)
+        fields['balance_breaks'] = len(breaks)
+        if breaks:
+            lines = [f"Balance break: {line}" for line in breaks[:MAX_REPORTED_BREAKS]]
+            fields['error'] = '\n'.join(filter(None, [fields['error']] + lines))
+    if stats.rejects:
+        name = f"{Path(job.original_name or job.file.name).stem}_rejects.csv"
+        job.rejects_file.save(name, ContentFile(rejects_csv(stats.rejects).encode('utf-8')), save=False)
+        fields['rejects_file'] = job.rejects_file.name
+    _update_job(job, status='COMPLETED', finished_at=timezone.now(), **fields)
+
+
+def fail_import_job(job, exc):
+    _update_job(job, status='FAILED', finished_at=timezone.now(), error=repr(exc))
+
+
+def run_import_job(job):
+    """
+    Import the file of a claimed job, recording progress after every chunk. A file
+    identical to an earlier job's is completed without parsing a row.
+    """
+    try:
+        with job.file.open('rb') as file:
+            if complete_if_identical(job, job.file_sha256 or file_sha256(file)):
+                return
+            stats = import_statement_csv(
+                file, job.created_by, job.bank_profile or None, on_progress=job_progress(job),
+            )
+    except Exception as exc:
+        fail_import_job(job, exc)
+        raise
+    finish_import_job(job, stats)
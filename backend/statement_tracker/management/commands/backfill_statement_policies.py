@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from statement_tracker.policies import backfill_policies
+
+
+class Command(BaseCommand):
+    help = (
+        "Split the policy_no of every bank statement into StatementPolicy rows, the index of the policy "
+        "lookups. Run once after upgrading and after policy_no was changed with queryset updates or SQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Statements read per query")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        added, removed = backfill_policies(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Statement policies synced: {added} added, {removed} removed in {time.perf_counter() - started:.1f}s"
+        ))
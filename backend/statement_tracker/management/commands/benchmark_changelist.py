@@ -0,0 +1,153 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from statement_tracker.models import BankStatement
+from statement_tracker.summary import SummaryDelta, summary_values
+
+# Seeded rows use their own bank code so they can be told apart and removed
+BENCH_BANK_CODE = 'BENCH'
+SEED_BATCH_SIZE = 5000
+PAGE_SIZE = 50
+
+
+def changelist_queries():
+    """The queries BankStatementAdmin runs for its common changelist pages"""
+    ordered = BankStatement.objects.order_by('-created_date', '-pk')
+    today = timezone.now()
+    branch = BankStatement.BRANCH_CHOICES[1][0]
+    source = BankStatement.SOURCE_TYPES[2][0]
+    return [
+        ('first page', lambda: list(ordered[:PAGE_SIZE])),
+        ('deep page (page 2000)', lambda: list(ordered[PAGE_SIZE * 2000:PAGE_SIZE * 2001])),
+        ('branch filter page', lambda: list(ordered.filter(branch=branch)[:PAGE_SIZE])),
+        ('source filter page', lambda: list(ordered.filter(source=source)[:PAGE_SIZE])),
+        ('bank name filter page', lambda: list(ordered.filter(bank_name='Nabil Bank')[:PAGE_SIZE])),
+        ('last updated filter page', lambda: list(ordered.filter(last_updated__gte=today - timedelta(days=7))[:PAGE_SIZE])),
+        ('date hierarchy month page', lambda: list(
+            ordered.filter(created_date__year=today.year, created_date__month=today.month)[:PAGE_SIZE])),
+        ('branch filter count', lambda: ordered.filter(branch=branch).count()),
+        ('date hierarchy months', lambda: list(BankStatement.objects.dates('created_date', 'month'))),
+    ]
+
+
+def explain_queries():
+    """Querysets whose plans are recorded, same order as changelist_queries where they apply"""
+    ordered = BankStatement.objects.order_by('-created_date', '-pk')
+    branch = BankStatement.BRANCH_CHOICES[1][0]
+    source = BankStatement.SOURCE_TYPES[2][0]
+    return [
+        ('first page', ordered[:PAGE_SIZE]),
+        ('branch filter page', ordered.filter(branch=branch)[:PAGE_SIZE]),
+        ('source filter page', ordered.filter(source=source)[:PAGE_SIZE]),
+        ('bank name filter page', ordered.filter(bank_name='Nabil Bank')[:PAGE_SIZE]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed bank statements and record the changelist query plans and timings "
+        "with and without the BankStatement indexes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Seed until this many benchmark rows exist")
+        parser.add_argument('--user', required=True, help="Email of the user the seeded rows are created by")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per query, the median is reported")
+        parser.add_argument('--compare', action='store_true',
+                            help="Also measure with the BankStatement Meta.indexes dropped (re-created afterwards)")
+        parser.add_argument('--output', help="Write the report to this file as well")
+        parser.add_argument('--cleanup', action='store_true', help="Delete the seeded rows and exit")
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            deleted, _ = BankStatement.objects.filter(bank_code=BENCH_BANK_CODE).delete()
+            self.stdout.write(f"Deleted {deleted} benchmark rows")
+            return
+
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+
+        self.seed(options['rows'], user)
+        report = [f"# Changelist benchmark on {connection.vendor}, {BankStatement.objects.count()} rows", ""]
+
+        if options['compare']:
+            indexes = BankStatement._meta.indexes
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(BankStatement, index)
+            try:
+                report += self.measure("Without indexes", options['repeat'])
+            finally:
+                with connection.schema_editor() as editor:
+                    for index in indexes:
+                        editor.add_index(BankStatement, index)
+
+        report += self.measure("With indexes", options['repeat'])
+        text = "\n".join(report)
+        self.stdout.write(text)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(text + "\n")
+
+    def seed(self, rows, user):
+        existing = BankStatement.objects.filter(bank_code=BENCH_BANK_CODE).count()
+        if existing >= rows:
+            return
+        self.stdout.write(f"Seeding {rows - existing} rows")
+        rng = random.Random(existing)
+        branches = [code for code, _ in BankStatement.BRANCH_CHOICES]
+        sources = [code for code, _ in BankStatement.SOURCE_TYPES]
+        banks = ['Nabil Bank', 'Nepal Bank', 'Global IME Bank', 'NIC Asia Bank', 'Himalayan Bank']
+        now = timezone.now()
+        for start in range(existing, rows, SEED_BATCH_SIZE):
+            batch = []
+            for number in range(start, min(start + SEED_BATCH_SIZE, rows)):
+                created = now - timedelta(minutes=rng.randrange(60 * 24 * 730))
+                statement = BankStatement(
+                    bank_code=BENCH_BANK_CODE,
+                    bank_name=rng.choice(banks),
+                    bank_account_no=str(rng.randrange(10)),
+                    bank_deposit_date=date(2024, 1, 1) + timedelta(days=rng.randrange(730)),
+                    bank_transaction_detail=f"Benchmark deposit {number}",
+                    debit=Decimal('0.00'),
+                    credit=Decimal(rng.randrange(100, 500000)),
+                    balance=Decimal(number),
+                    branch=rng.choice(branches),
+                    source=rng.choice(sources),
+                    created_by=user,
+                    created_date=created,
+                )
+                statement.fingerprint = statement.compute_fingerprint()
+                batch.append(statement)
+            # Counted in DailyStatementSummary like imported rows, so --cleanup takes them out again
+            delta = SummaryDelta()
+            for statement in batch:
+                delta.add(summary_values(statement))
+            with transaction.atomic():
+                BankStatement.objects.bulk_create(batch)
+                delta.apply()
+            self.stdout.write(f"  {start + len(batch)} / {rows}")
+
+    def measure(self, title, repeat):
+        lines = [f"## {title}", "", "| Query | Median ms |", "| --- | ---: |"]
+        for name, run in changelist_queries():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            lines.append(f"| {name} | {statistics.median(timings):.1f} |")
+        lines.append("")
+        for name, queryset in explain_queries():
+            lines += [f"### Plan: {name}", "```", queryset.explain(), "```", ""]
+        return lines
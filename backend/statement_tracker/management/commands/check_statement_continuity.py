@@ -0,0 +1,51 @@
+import csv
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from statement_tracker.continuity import check_continuity
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that every statement line's balance follows from the line before it "
+        "(balance = previous balance + credit - debit) and list the breaks, e.g. for a whole fiscal year"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', type=parse_date, help="First deposit date (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='date_to', type=parse_date, help="Last deposit date (YYYY-MM-DD)")
+        parser.add_argument('--account', nargs=2, metavar=('BANK_CODE', 'ACCOUNT_NO'),
+                            help="Check only this account")
+        parser.add_argument('--report', help="Also write the breaks to this CSV file")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        accounts = [tuple(options['account'])] if options['account'] else None
+        result = check_continuity(options['date_from'], options['date_to'], accounts)
+        for line in result.breaks:
+            self.stdout.write(self.style.WARNING(str(line)))
+
+        if options['report']:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as report:
+                writer = csv.writer(report)
+                writer.writerow([
+                    'bank_code', 'bank_account_no', 'position', 'statement_id', 'previous_statement_id',
+                    'bank_deposit_date', 'expected_balance', 'balance', 'difference',
+                ])
+                for line in result.breaks:
+                    writer.writerow([
+                        line.bank_code, line.account_no, line.position, line.statement_id, line.previous_id,
+                        line.deposit_date, line.expected, line.balance, line.difference,
+                    ])
+
+        style = self.style.WARNING if result.breaks else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{len(result.breaks)} balance breaks in {result.lines} lines of {result.accounts} accounts "
+            f"({time.perf_counter() - started:.1f}s)"
+        ))
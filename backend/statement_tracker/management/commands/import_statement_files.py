@@ -0,0 +1,67 @@
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from statement_tracker.importer import claim_job, queue_statement_files
+from statement_tracker.statement_parser import BANK_PROFILES
+from statement_tracker.parallel_import import (
+    IMPORT_WORKERS, STATEMENT_FILE_EXTENSIONS, iter_upload_files, run_import_jobs,
+)
+
+
+class Command(BaseCommand):
+    help = "Import bank statement files, folders of them or zip archives, parsing the files in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Statement CSV files, folders or zip archives")
+        parser.add_argument('--user', required=True, help="Email of the user the statements are created by")
+        parser.add_argument('--profile', choices=sorted(BANK_PROFILES), default='',
+                            help="Column layout of the files, detected from the header by default")
+        parser.add_argument('--workers', type=int, default=IMPORT_WORKERS, help="Files parsed at once")
+        parser.add_argument('--queue-only', action='store_true',
+                            help="Only queue the files for process_statement_imports")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+
+        with ExitStack() as stack:
+            files = []
+            for path in self.statement_paths(options['paths']):
+                upload = stack.enter_context(File(open(path, 'rb'), name=path.name))
+                files.extend(iter_upload_files(upload))
+            jobs, duplicates = queue_statement_files(files, user, options['profile'])
+
+        for name, earlier in duplicates:
+            self.stdout.write(self.style.WARNING(f"{name}: identical to import job #{earlier.pk}, skipped"))
+        if options['queue_only'] or not jobs:
+            self.stdout.write(f"Queued {len(jobs)} file(s)")
+            return
+
+        jobs = [job for job in jobs if claim_job(job)]
+        summaries = run_import_jobs(jobs, options['workers'])
+        for summary in summaries:
+            style = self.style.ERROR if summary.status == 'FAILED' else self.style.SUCCESS
+            self.stdout.write(style(f"Job {summary.job.pk} {summary}"))
+        self.stdout.write(
+            f"{len(summaries)} file(s): {sum(s.created for s in summaries)} created, "
+            f"{sum(s.skipped for s in summaries)} skipped, {sum(s.failed for s in summaries)} failed"
+        )
+
+    def statement_paths(self, paths):
+        for value in paths:
+            path = Path(value)
+            if path.is_dir():
+                yield from sorted(
+                    child for child in path.iterdir()
+                    if child.is_file() and child.suffix.lower() in STATEMENT_FILE_EXTENSIONS + ('.zip',)
+                )
+            elif path.is_file():
+                yield path
+            else:
+                raise CommandError(f"{value} does not exist")
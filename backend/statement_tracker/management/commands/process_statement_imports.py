@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from statement_tracker.importer import claim_next_job, requeue_stale_jobs, run_import_job
+from statement_tracker.parallel_import import run_import_jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued bank statement uploads (StatementImportJob)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty instead of polling")
+        parser.add_argument('--poll-interval', type=float, default=5, help="Seconds to wait when the queue is empty")
+        parser.add_argument('--stale-after', type=int, default=15,
+                            help="Minutes without progress after which a running job is re-queued")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Parse up to this many queued files at once in a process pool")
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options['stale_after'])
+        while True:
+            requeued = requeue_stale_jobs(stale_after)
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Re-queued {requeued} stalled job(s)"))
+
+            jobs = []
+            while len(jobs) < max(1, options['workers']):
+                job = claim_next_job()
+                if job is None:
+                    break
+                jobs.append(job)
+            if not jobs:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+
+            if options['workers'] > 1:
+                self.run_parallel(jobs, options['workers'])
+            else:
+                self.run_job(jobs[0])
+
+    def run_job(self, job):
+        self.stdout.write(f"Importing job {job.pk}: {job.original_name}")
+        try:
+            run_import_job(job)
+        except Exception as exc:
+            self.stderr.write(self.style.ERROR(f"Job {job.pk} failed: {exc!r}"))
+            return
+
+        job.refresh_from_db()
+        self.stdout.write(self.style.SUCCESS(
+            f"Job {job.pk} done: {job.rows_inserted} created, {job.rows_skipped} skipped, "
+            f"{job.rows_failed} failed ({job.rows_per_second} rows/s)"
+        ))
+
+    def run_parallel(self, jobs, workers):
+        self.stdout.write(f"Importing {len(jobs)} job(s) with {workers} workers")
+        for summary in run_import_jobs(jobs, workers):
+            style = self.style.ERROR if summary.status == 'FAILED' else self.style.SUCCESS
+            self.stdout.write(style(f"Job {summary.job.pk} {summary}"))
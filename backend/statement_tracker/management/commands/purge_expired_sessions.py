@@ -0,0 +1,35 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# Keys are bound one parameter each; older SQLite builds allow at most 999 per statement
+MAX_CHUNK_SIZE = 900
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions from the database in small chunks, so the session table "
+        "is never locked for long. Use instead of clearsessions on large tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=MAX_CHUNK_SIZE,
+                            help=f"Sessions deleted per statement, at most {MAX_CHUNK_SIZE}")
+        parser.add_argument('--pause', type=float, default=0.1, help="Seconds to wait between chunks")
+
+    def handle(self, *args, **options):
+        if not 0 < options['chunk_size'] <= MAX_CHUNK_SIZE:
+            raise CommandError(f"--chunk-size must be between 1 and {MAX_CHUNK_SIZE}")
+        cutoff = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=cutoff).order_by('expire_date')
+        deleted = 0
+        while True:
+            # Keys first: a DELETE with LIMIT is not portable, and the keys come from the expire_date index
+            keys = list(expired.values_list('session_key', flat=True)[:options['chunk_size']])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} expired sessions deleted"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from statement_tracker.search import drop_search_index, ensure_search_index
+
+
+class Command(BaseCommand):
+    help = "Drop and re-create the bank statement full-text index (SQLite FTS5 or MySQL FULLTEXT)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        drop_search_index(options['database'])
+        if ensure_search_index(options['database']):
+            self.stdout.write(self.style.SUCCESS("Full-text index rebuilt"))
+        else:
+            self.stdout.write(self.style.WARNING("This database has no full-text support, admin search uses LIKE"))
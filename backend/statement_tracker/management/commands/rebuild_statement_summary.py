@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from statement_tracker.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily statement summary from the bank statements"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(
+            f"Daily statement summary rebuilt: {rows} rows in {time.perf_counter() - started:.1f}s"
+        ))
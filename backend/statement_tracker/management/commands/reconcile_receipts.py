@@ -0,0 +1,66 @@
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from statement_tracker.reconciliation import apply_matches, reconcile, write_unmatched_reports
+from statement_tracker.split_matcher import DEFAULT_MAX_PARTS
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Match unreconciled bank credits against a receipt register CSV "
+        "(voucher_no, amount, bank_account_no, receipt_date[, policy_no]) and fill in the system vouchers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('register', help="Receipt register CSV exported from the core system")
+        parser.add_argument('--user', required=True, help="Email of the user the changes are recorded for")
+        parser.add_argument('--date-window', type=int, default=3,
+                            help="Maximum days between bank deposit date and receipt date")
+        parser.add_argument('--from', dest='date_from', type=parse_date, help="First deposit date (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='date_to', type=parse_date, help="Last deposit date (YYYY-MM-DD)")
+        parser.add_argument('--split-parts', type=int, default=DEFAULT_MAX_PARTS,
+                            help="Most receipts one credit may be split into, 0 to disable split matching")
+        parser.add_argument('--report-dir', default='.', help="Where the unmatched row reports are written")
+        parser.add_argument('--dry-run', action='store_true', help="Only report, do not update statements")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+
+        started = time.monotonic()
+        with open(options['register'], 'rb') as register:
+            try:
+                result = reconcile(
+                    register, options['date_window'], options['date_from'], options['date_to'],
+                    options['split_parts'],
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        self.stdout.write(
+            f"Matched {len(result.matches)} + {len(result.split_matches)} split of {len(result.statements)} statements "
+            f"against {len(result.receipts)} receipts in {time.monotonic() - started:.2f}s"
+        )
+        for error in result.errors:
+            self.stderr.write(self.style.WARNING(f"Skipped register {error}"))
+
+        if not options['dry_run']:
+            updated = apply_matches(result, user)
+            self.stdout.write(self.style.SUCCESS(f"Reconciled {updated} statements"))
+
+        report_dir = Path(options['report_dir'])
+        report_dir.mkdir(parents=True, exist_ok=True)
+        with open(report_dir / 'unmatched_statements.csv', 'w', newline='', encoding='utf-8') as statements_file, \
+                open(report_dir / 'unmatched_receipts.csv', 'w', newline='', encoding='utf-8') as receipts_file:
+            write_unmatched_reports(result, statements_file, receipts_file)
+        self.stdout.write(f"Unmatched rows written to {report_dir / 'unmatched_statements.csv'} "
+                          f"and {report_dir / 'unmatched_receipts.csv'}")
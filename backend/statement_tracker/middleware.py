@@ -1,8 +1,18 @@
+from django.conf import settings
 from django.contrib.auth import logout
 from django.utils.timezone import now
 
 
 class SecureSessionMiddleware:
+    """
+    Logs out sessions that were idle for SESSION_INACTIVITY_TIMEOUT seconds or that
+    changed browser or IP address.
+
+    The session is only saved when it changes, so last_activity is only rewritten
+    once it is SESSION_ACTIVITY_GRANULARITY seconds old; the other requests cause no
+    session write. The stored time then trails the real last request by less than the
+    granularity, which makes the inactivity check stricter, never looser.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
 
@@ -12,7 +22,7 @@ class SecureSessionMiddleware:
             last_activity = request.session.get('last_activity')
 
             # 1. Check for Inactivity (Session Life Cycle Management)
-            timeout = 30 * 60
+            timeout = settings.SESSION_INACTIVITY_TIMEOUT
             if last_activity and (current_time - last_activity > timeout):
                 logout(request)
                 return self.get_response(request)
@@ -34,7 +44,9 @@ class SecureSessionMiddleware:
                 request.session.flush()
                 return self.get_response(request)
 
-            request.session['last_activity'] = current_time
+            # 3. Record the activity, coalescing the writes of close requests
+            if last_activity is None or current_time - last_activity >= settings.SESSION_ACTIVITY_GRANULARITY:
+                request.session['last_activity'] = current_time
 
         return self.get_response(request)
 
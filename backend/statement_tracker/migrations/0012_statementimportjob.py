@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0011_alter_user_department'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatementImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(help_text='Uploaded statement file', upload_to='statement_imports/%Y/%m/')),
+                ('original_name', models.CharField(blank=True, help_text='Name of the uploaded file', max_length=255)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], db_index=True, default='QUEUED', max_length=20)),
+                ('rows_parsed', models.PositiveIntegerField(default=0)),
+                ('rows_inserted', models.PositiveIntegerField(default=0)),
+                ('rows_skipped', models.PositiveIntegerField(default=0, help_text='Duplicates of existing statements')),
+                ('rows_failed', models.PositiveIntegerField(default=0, help_text='Rows that could not be parsed')),
+                ('error', models.TextField(blank=True, help_text='Row errors or the reason the job failed')),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True, help_text='Refreshed by the worker after every chunk')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='statement_import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Statement Import Job',
+                'verbose_name_plural': 'Statement Import Jobs',
+                'ordering': ['-created_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,111 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, transaction
+
+AMOUNT_FIELDS = ('balance', 'debit', 'credit', 'system_amount')
+CHUNK_SIZE = 2000
+PAISA = Decimal('0.01')
+# DecimalField(max_digits=15, decimal_places=2)
+MAX_AMOUNT = Decimal(10) ** 13
+
+
+def to_amount(text):
+    """
+    Parse a stored text amount ("1,000.0", " 1000 ", "") into a Decimal, None when blank.
+    Raises InvalidOperation for text that is not a finite amount the column can hold.
+    """
+    if text is None:
+        return None
+    text = str(text).replace(',', '').strip()
+    if not text:
+        return None
+    amount = Decimal(text)
+    # "NaN" and "Infinity" parse, as importer.parse_amount guards against
+    if not amount.is_finite():
+        raise InvalidOperation(text)
+    amount = amount.quantize(PAISA)
+    if abs(amount) >= MAX_AMOUNT:
+        raise InvalidOperation(text)
+    return amount
+
+
+def backfill(model, defaults=None):
+    """
+    Copy the text amounts into the decimal columns in primary key ranges and return
+    the (pk, field, text) of the amounts that are not numbers; those get the default.
+
+    Each chunk commits on its own so the table is never locked for long. The copy
+    only writes the new columns, so an interrupted run can simply be started again.
+    """
+    defaults = defaults or {}
+    last_pk = 0
+    invalid = []
+    while True:
+        rows = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values('pk', *AMOUNT_FIELDS)[:CHUNK_SIZE]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+        updates = []
+        for row in rows:
+            obj = model(pk=row['pk'])
+            for field in AMOUNT_FIELDS:
+                try:
+                    amount = to_amount(row[field])
+                except InvalidOperation:
+                    invalid.append((row['pk'], field, row[field]))
+                    amount = None
+                if amount is None:
+                    amount = defaults.get(field)
+                setattr(obj, f'{field}_amount', amount)
+            updates.append(obj)
+        with transaction.atomic():
+            model.objects.bulk_update(updates, [f'{field}_amount' for field in AMOUNT_FIELDS])
+
+    return invalid
+
+
+def forwards(apps, schema_editor):
+    BankStatement = apps.get_model('statement_tracker', 'BankStatement')
+    BankStatementChangeHistory = apps.get_model('statement_tracker', 'BankStatementChangeHistory')
+
+    # balance is NOT NULL on BankStatement, a blank one was the "0" default
+    invalid = backfill(BankStatement, defaults={'balance': Decimal('0.00')})
+    if invalid:
+        # Left for the accounts team to correct from the bank's statement
+        sample = ', '.join(f'#{pk} {field}={value!r}' for pk, field, value in invalid[:20])
+        print(f"\n  {len(invalid)} bank statement amounts are not numbers and were left empty (balance 0): {sample}")
+    # History rows are an audit copy, an unreadable old amount is kept as NULL
+    backfill(BankStatementChangeHistory)
+
+    # "1000" and "1000.0" were different keys as text, they are the same amount now
+    from django.db.models import Count
+    duplicates = list(
+        BankStatement.objects.values('bank_code', 'balance_amount', 'credit_amount', 'bank_deposit_date')
+        .annotate(rows=Count('id')).filter(rows__gt=1, credit_amount__isnull=False, bank_deposit_date__isnull=False)[:20]
+    )
+    if duplicates:
+        sample = '; '.join(
+            f"{row['bank_code']} {row['bank_deposit_date']} balance={row['balance_amount']} credit={row['credit_amount']}"
+            for row in duplicates
+        )
+        raise ValueError(f"Bank statements that only differed by amount formatting must be merged first: {sample}")
+
+
+def backwards(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+    """Step 2 of 3: chunked copy of the text amounts, one transaction per chunk"""
+
+    atomic = False
+
+    dependencies = [
+        ('statement_tracker', '0013_bankstatement_amount_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Step 3 of 3: drop the text columns and give the decimal ones their names, indexes and constraint"""
+
+    dependencies = [
+        ('statement_tracker', '0014_backfill_amount_columns'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='bankstatement',
+            name='unique_bank_statement',
+        ),
+    ]
+
+    for model_name in ('bankstatement', 'bankstatementchangehistory'):
+        for field_name in ('balance', 'debit', 'credit', 'system_amount'):
+            operations += [
+                migrations.RemoveField(model_name=model_name, name=field_name),
+                migrations.RenameField(model_name=model_name, old_name=f'{field_name}_amount', new_name=field_name),
+            ]
+
+    operations += [
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='balance',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Bank balance', max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='debit',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, default=0, help_text='Debit amount', max_digits=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='credit',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, default=0, help_text='Credit amount', max_digits=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='system_amount',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, default=0, help_text='System amount', max_digits=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankstatementchangehistory',
+            name='balance',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Bank balance', max_digits=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankstatementchangehistory',
+            name='debit',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Debit amount', max_digits=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankstatementchangehistory',
+            name='credit',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Credit amount', max_digits=15, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankstatementchangehistory',
+            name='system_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='System amount', max_digits=15, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='bankstatement',
+            constraint=models.UniqueConstraint(fields=('bank_code', 'balance', 'credit', 'bank_deposit_date'), name='unique_bank_statement'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0015_bankstatement_decimal_amounts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['created_date', 'id'], name='statement_t_created_dc86ed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['branch', 'created_date'], name='statement_t_branch_cb9896_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['source', 'created_date'], name='statement_t_source_e5f6df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['bank_name', 'created_date'], name='statement_t_bank_na_8854a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['last_updated'], name='statement_t_last_up_d43467_idx'),
+        ),
+    ]
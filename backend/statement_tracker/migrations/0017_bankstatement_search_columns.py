@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0016_bankstatement_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='bank_account_no',
+            field=models.CharField(db_index=True, help_text='Bank account number', max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='system_voucher_no',
+            field=models.CharField(blank=True, db_index=True, help_text='System voucher number (e.g., RP300181820000001)', max_length=255, null=True),
+        ),
+    ]
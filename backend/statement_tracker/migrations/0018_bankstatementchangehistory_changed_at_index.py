@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0017_bankstatement_search_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bankstatementchangehistory',
+            index=models.Index(fields=['changed_at'], name='bank_history_changed_idx'),
+        ),
+    ]
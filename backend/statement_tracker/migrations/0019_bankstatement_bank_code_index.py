@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0018_bankstatementchangehistory_changed_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['bank_code', 'created_date'], name='statement_t_bank_co_54f705_idx'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+import hashlib
+import re
+from decimal import Decimal
+
+from django.db import migrations, models, transaction
+
+CHUNK_SIZE = 2000
+
+# statement_tracker.models.FINGERPRINT_FIELDS and statement_fingerprint() as of this migration
+FINGERPRINT_FIELDS = (
+    'bank_code', 'bank_account_no', 'bank_deposit_date', 'bank_transaction_detail', 'debit', 'credit', 'balance',
+)
+
+
+def statement_fingerprint(values):
+    parts = []
+    for field in FINGERPRINT_FIELDS:
+        value = values.get(field)
+        if field in ('debit', 'credit', 'balance'):
+            value = f"{Decimal(value or 0).quantize(Decimal('0.01')):f}"
+        elif field == 'bank_deposit_date':
+            value = value.isoformat() if value else ''
+        elif field == 'bank_account_no':
+            value = re.sub(r'[\s-]', '', value or '')
+        else:
+            value = ' '.join((value or '').split()).casefold()
+        parts.append(value)
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """
+    Fingerprint the stored statements in primary key ranges, one transaction per chunk.
+
+    Rows that collide with an earlier row only differed by case or spacing; they keep
+    a NULL fingerprint, which BankStatement.save() keeps until the line itself is edited.
+    """
+    BankStatement = apps.get_model('statement_tracker', 'BankStatement')
+    seen = set(BankStatement.objects.exclude(fingerprint=None).values_list('fingerprint', flat=True))
+    last_pk = 0
+    while True:
+        rows = list(
+            BankStatement.objects.filter(pk__gt=last_pk, fingerprint=None)
+            .order_by('pk').values('pk', *FINGERPRINT_FIELDS)[:CHUNK_SIZE]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+        updates = []
+        for row in rows:
+            fingerprint = statement_fingerprint(row)
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            updates.append(BankStatement(pk=row['pk'], fingerprint=fingerprint))
+        with transaction.atomic():
+            BankStatement.objects.bulk_update(updates, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+    """Replace the (bank_code, balance, credit, bank_deposit_date) constraint with a line fingerprint"""
+
+    atomic = False
+
+    dependencies = [
+        ('statement_tracker', '0019_bankstatement_bank_code_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankstatement',
+            name='fingerprint',
+            field=models.CharField(editable=False, help_text='Hash of the statement line, see statement_fingerprint()', max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='bankstatement',
+            name='unique_bank_statement',
+        ),
+        migrations.AddField(
+            model_name='statementimportjob',
+            name='file_sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='Hash of the uploaded file', max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0020_bankstatement_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statementimportjob',
+            name='bank_profile',
+            field=models.CharField(blank=True, help_text='Column layout of the file, blank to detect it', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='statementimportjob',
+            name='rejects_file',
+            field=models.FileField(blank=True, help_text='CSV of the rows that could not be imported', upload_to='statement_imports/rejects/%Y/%m/'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_summary(apps, schema_editor):
+    """Same GROUP BY as statement_tracker.summary.rebuild_summaries, on the historical models"""
+    BankStatement = apps.get_model('statement_tracker', 'BankStatement')
+    DailyStatementSummary = apps.get_model('statement_tracker', 'DailyStatementSummary')
+    money = models.DecimalField(max_digits=19, decimal_places=2)
+    rows = (
+        BankStatement.objects.order_by()
+        .annotate(branch_key=Coalesce('branch', Value('')), source_key=Coalesce('source', Value('')))
+        .values('bank_code', 'bank_deposit_date', 'branch_key', 'source_key')
+        .annotate(
+            credit_total=Coalesce(Sum('credit'), Value(Decimal('0')), output_field=money),
+            debit_total=Coalesce(Sum('debit'), Value(Decimal('0')), output_field=money),
+            row_count=Count('id'),
+            reconciled_count=Count('id', filter=Q(system_voucher_no__gt='')),
+        )
+    )
+    DailyStatementSummary.objects.bulk_create(
+        [
+            DailyStatementSummary(
+                bank_code=row['bank_code'], bank_deposit_date=row['bank_deposit_date'],
+                branch=row['branch_key'], source=row['source_key'],
+                credit_total=row['credit_total'], debit_total=row['debit_total'],
+                row_count=row['row_count'], reconciled_count=row['reconciled_count'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0021_statementimportjob_bank_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatementSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bank_code', models.CharField(max_length=255)),
+                ('bank_deposit_date', models.DateField(blank=True, null=True)),
+                ('branch', models.CharField(blank=True, choices=[('head_office', 'प्रधान कार्यलय'), ('chabahil', 'चाबहिल'), ('lagankhel', 'लगनखेल'), ('kalanki', 'कलंकी'), ('suryabinayak', 'सूर्यविनायक'), ('banepa', 'बनेपा'), ('biratnagar', 'विराटनगर'), ('birgunj', 'वीरगञ्ज'), ('pokhara', 'पोखरा'), ('butwal', 'बुटवल'), ('nepalgunj', 'नेपालगञ्ज'), ('dhangadhi', 'धनगढी'), ('hetauda', 'हेटौडा'), ('bhaktapur', 'भक्तपुर'), ('baglung', 'बागलुङ'), ('dhankuta', 'धनकुटा'), ('birtamod', 'बिर्तामोड'), ('narayangadh', 'नारायणगढ'), ('ghorahi', 'घोराही'), ('janakpur', 'जनकपुर'), ('surkhet', 'सुर्खेत'), ('ithari', 'इटहरी'), ('mahendranagar', 'महेन्द्रनगर')], max_length=255)),
+                ('source', models.CharField(blank=True, choices=[('Cheque', 'Cheque'), ('BankVoucher', 'Physical Bank Voucher'), ('PhonePay', 'PhonePay'), ('ConnectIPS', 'ConnectIPS'), ('Esewa', 'Esewa'), ('Khalti', 'Khalti'), ('IMEPAY', 'IMEPAY'), ('NEPALPAY', 'NEPALPAY'), ('Other', 'Other')], max_length=255)),
+                ('credit_total', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('debit_total', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('reconciled_count', models.PositiveIntegerField(default=0, help_text='Statements with a system voucher')),
+            ],
+            options={
+                'verbose_name': 'Daily Statement Summary',
+                'verbose_name_plural': 'Daily Statement Summary',
+                'ordering': ['-bank_deposit_date', 'bank_code', 'branch', 'source'],
+                'indexes': [models.Index(fields=['bank_deposit_date', 'bank_code'], name='statement_t_bank_de_b10658_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bank_code', 'bank_deposit_date', 'branch', 'source'), name='unique_daily_statement_summary')],
+            },
+        ),
+        migrations.RunPython(fill_summary, migrations.RunPython.noop),
+    ]
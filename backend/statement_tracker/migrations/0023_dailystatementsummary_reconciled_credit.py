@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:28
+
+from django.db import migrations, models
+from django.db.models import Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_reconciled_credit(apps, schema_editor):
+    """Credit of the reconciled statements per summary row, one UPDATE per row that has any"""
+    BankStatement = apps.get_model('statement_tracker', 'BankStatement')
+    DailyStatementSummary = apps.get_model('statement_tracker', 'DailyStatementSummary')
+    rows = (
+        BankStatement.objects.order_by()
+        .filter(system_voucher_no__gt='')
+        .annotate(branch_key=Coalesce('branch', Value('')), source_key=Coalesce('source', Value('')))
+        .values('bank_code', 'bank_deposit_date', 'branch_key', 'source_key')
+        .annotate(reconciled_credit=Sum('credit'))
+    )
+    for row in rows.iterator(chunk_size=1000):
+        DailyStatementSummary.objects.filter(
+            bank_code=row['bank_code'], bank_deposit_date=row['bank_deposit_date'],
+            branch=row['branch_key'], source=row['source_key'],
+        ).update(reconciled_credit=row['reconciled_credit'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0022_dailystatementsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailystatementsummary',
+            name='reconciled_credit',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Credit of the statements with a system voucher', max_digits=19),
+        ),
+        migrations.RunPython(fill_reconciled_credit, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:33
+
+import filestore.storage
+import statement_tracker.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0023_dailystatementsummary_reconciled_credit'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='bank_voucher',
+            field=models.FileField(blank=True, null=True, storage=filestore.storage.content_addressed_storage, upload_to='vouchers/', validators=[statement_tracker.models.BankStatement.validate_file_size]),
+        ),
+    ]
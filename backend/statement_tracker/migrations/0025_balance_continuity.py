@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0024_alter_bankstatement_bank_voucher'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statementimportjob',
+            name='balance_breaks',
+            field=models.PositiveIntegerField(default=0, help_text='Lines whose balance does not follow from the line before, e.g. after a missing line'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['bank_code', 'bank_account_no', 'bank_deposit_date'], name='statement_t_bank_co_ffb961_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0025_balance_continuity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatementPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('policy_no', models.CharField(help_text='Normalized policy number', max_length=50)),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='policies', to='statement_tracker.bankstatement')),
+            ],
+            options={
+                'verbose_name': 'Statement Policy',
+                'verbose_name_plural': 'Statement Policies',
+                'constraints': [models.UniqueConstraint(fields=('policy_no', 'statement'), name='unique_statement_policy')],
+            },
+        ),
+    ]
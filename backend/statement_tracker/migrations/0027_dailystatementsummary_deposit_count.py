@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:55
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_deposit_counts(apps, schema_editor):
+    """Deposits and reconciled deposits per summary row, one UPDATE per row that has any"""
+    BankStatement = apps.get_model('statement_tracker', 'BankStatement')
+    DailyStatementSummary = apps.get_model('statement_tracker', 'DailyStatementSummary')
+    rows = (
+        BankStatement.objects.order_by()
+        .filter(credit__gt=0)
+        .annotate(branch_key=Coalesce('branch', Value('')), source_key=Coalesce('source', Value('')))
+        .values('bank_code', 'bank_deposit_date', 'branch_key', 'source_key')
+        .annotate(deposit_count=Count('id'), reconciled_deposit_count=Count('id', filter=Q(system_voucher_no__gt='')))
+    )
+    for row in rows.iterator(chunk_size=1000):
+        DailyStatementSummary.objects.filter(
+            bank_code=row['bank_code'], bank_deposit_date=row['bank_deposit_date'],
+            branch=row['branch_key'], source=row['source_key'],
+        ).update(deposit_count=row['deposit_count'], reconciled_deposit_count=row['reconciled_deposit_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statement_tracker', '0026_statementpolicy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailystatementsummary',
+            name='deposit_count',
+            field=models.PositiveIntegerField(default=0, help_text='Statements with a credit'),
+        ),
+        migrations.AddField(
+            model_name='dailystatementsummary',
+            name='reconciled_deposit_count',
+            field=models.PositiveIntegerField(default=0, help_text='Statements with a credit and a system voucher'),
+        ),
+        migrations.RunPython(fill_deposit_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+import datetime
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+# statement_tracker.models.UNDATED as of this migration
+UNDATED = datetime.date(1000, 1, 1)
+
+
+def date_undated_rows(apps, schema_editor):
+    """Replace the summary rows without a date, duplicates included, with one per key dated UNDATED"""
+    BankStatement = apps.get_model('statement_tracker', 'BankStatement')
+    DailyStatementSummary = apps.get_model('statement_tracker', 'DailyStatementSummary')
+    money = models.DecimalField(max_digits=19, decimal_places=2)
+    reconciled = Q(system_voucher_no__gt='')
+    DailyStatementSummary.objects.filter(bank_deposit_date=None).delete()
+    rows = (
+        BankStatement.objects.order_by()
+        .filter(bank_deposit_date=None)
+        .annotate(branch_key=Coalesce('branch', Value('')), source_key=Coalesce('source', Value('')))
+        .values('bank_code', 'branch_key', 'source_key')
+        .annotate(
+            credit_total=Coalesce(Sum('credit'), Value(Decimal('0')), output_field=money),
+            debit_total=Coalesce(Sum('debit'), Value(Decimal('0')), output_field=money),
+            row_count=Count('id'),
+            reconciled_count=Count('id', filter=reconciled),
+            reconciled_credit=Coalesce(Sum('credit', filter=reconciled), Value(Decimal('0')), output_field=money),
+            deposit_count=Count('id', filter=Q(credit__gt=0)),
+            reconciled_deposit_count=Count('id', filter=Q(credit__gt=0) & reconciled),
+        )
+    )
+    DailyStatementSummary.objects.bulk_create(
+        [
+            DailyStatementSummary(
+                bank_code=row['bank_code'], bank_deposit_date=UNDATED,
+                branch=row['branch_key'], source=row['source_key'],
+                credit_total=row['credit_total'], debit_total=row['debit_total'],
+                row_count=row['row_count'], reconciled_count=row['reconciled_count'],
+                reconciled_credit=row['reconciled_credit'], deposit_count=row['deposit_count'],
+                reconciled_deposit_count=row['reconciled_deposit_count'],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+def undate_rows(apps, schema_editor):
+    DailyStatementSummary = apps.get_model('statement_tracker', 'DailyStatementSummary')
+    DailyStatementSummary.objects.filter(bank_deposit_date=UNDATED).update(bank_deposit_date=None)
+
+
+class Migration(migrations.Migration):
+    """Keep undated statements under UNDATED, NULLs do not collide in the unique key"""
+
+    dependencies = [
+        ('statement_tracker', '0027_dailystatementsummary_deposit_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(date_undated_rows, undate_rows),
+        migrations.AlterField(
+            model_name='dailystatementsummary',
+            name='bank_deposit_date',
+            field=models.DateField(help_text='1000-01-01 for statements without a deposit date'),
+        ),
+    ]
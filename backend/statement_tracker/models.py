@@ -3,12 +3,19 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+import hashlib
 import re
+from datetime import date
+from decimal import Decimal
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from rjbcl.common_data import DESIGNATION_CHOICES
 from ticket.models import Department
 from rjbcl.common_data import get_default_department
+from filestore.storage import content_addressed_storage
 
 
 
@@ -121,8 +128,61 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 
 
+# Money columns: NPR with paisa
+AMOUNT_MAX_DIGITS = 15
+AMOUNT_DECIMAL_PLACES = 2
+
+# Fields that identify a statement line, hashed into BankStatement.fingerprint
+FINGERPRINT_FIELDS = (
+    'bank_code', 'bank_account_no', 'bank_deposit_date', 'bank_transaction_detail', 'debit', 'credit', 'balance',
+)
+
+
+def statement_fingerprint(values):
+    """
+    SHA-256 of the canonical form of a statement line: amounts as plain decimals with
+    paisa, the account without spaces or dashes, the detail with collapsed whitespace
+    and case. Re-exports that only format the same line differently get the same hash.
+    """
+    parts = []
+    for field in FINGERPRINT_FIELDS:
+        value = values.get(field)
+        if field in ('debit', 'credit', 'balance'):
+            value = f"{Decimal(value or 0).quantize(Decimal('0.01')):f}"
+        elif field == 'bank_deposit_date':
+            value = value.isoformat() if value else ''
+        elif field == 'bank_account_no':
+            value = re.sub(r'[\s-]', '', value or '')
+        else:
+            value = ' '.join((value or '').split()).casefold()
+        parts.append(value)
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class BankStatementQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the rows and take them out of DailyStatementSummary in the same transaction"""
+        from .summary import SUMMARY_FIELDS, SummaryDelta
+        with transaction.atomic(using=self.db):
+            delta = SummaryDelta()
+            for values in self.values(*SUMMARY_FIELDS).order_by().iterator(chunk_size=2000):
+                delta.remove(values)
+            result = super().delete()
+            delta.apply()
+        return result
+
+    def totals(self):
+        """Sum the money columns in the database"""
+        return self.aggregate(
+            total_debit=Coalesce(Sum('debit'), Value(Decimal('0')), output_field=models.DecimalField()),
+            total_credit=Coalesce(Sum('credit'), Value(Decimal('0')), output_field=models.DecimalField()),
+            total_system_amount=Coalesce(Sum('system_amount'), Value(Decimal('0')), output_field=models.DecimalField()),
+            count=Count('id'),
+        )
+
+
 class BankStatement(models.Model):
-    objects = None
+    objects = BankStatementQuerySet.as_manager()
     TRANSACTION_TYPES = [
         ('DEPOSIT', 'Deposit'),
         ('REFUND', 'Refund'),
@@ -173,20 +233,21 @@ class BankStatement(models.Model):
 
     bank_code = models.CharField(max_length=255, help_text="NBL")
     bank_name = models.CharField(max_length=255, help_text="Bank name")
-    bank_account_no = models.CharField(max_length=255, null=True, help_text="Bank account number")
+    bank_account_no = models.CharField(max_length=255, null=True, db_index=True, help_text="Bank account number")
     bank_deposit_date = models.DateField(null=True, blank=True, help_text="Bank deposit date")
-    balance = models.CharField(max_length=255, default="0", help_text="Bank balance stored as text")
+    balance = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, default=0, help_text="Bank balance")
     bank_transaction_detail= models.CharField(max_length=255, null=True, help_text="Bank transaction detail")
-    debit = models.CharField(max_length=255, default="0", null=True, blank=True, help_text="Debit amount")
-    credit = models.CharField(max_length=255, default="0", null=True, blank=True, help_text="Credit amount")
-    system_voucher_no = models.CharField(max_length=255, blank=True, null=True, help_text="System voucher number (e.g., RP300181820000001)")
-    system_amount = models.CharField(max_length=255, default="0", null=True, blank=True, help_text="System amount")
+    debit = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, default=0, null=True, blank=True, db_index=True, help_text="Debit amount")
+    credit = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, default=0, null=True, blank=True, db_index=True, help_text="Credit amount")
+    system_voucher_no = models.CharField(max_length=255, blank=True, null=True, db_index=True, help_text="System voucher number (e.g., RP300181820000001)")
+    system_amount = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, default=0, null=True, blank=True, db_index=True, help_text="System amount")
     policy_no = models.CharField(max_length=500, null=True, help_text="Policy number(s), e.g., 2156, 2122")
     remarks = models.TextField(blank=True, null=True, help_text="Remarks")
     branch = models.CharField(max_length=255, choices=BRANCH_CHOICES, null=True, blank=True, help_text="Receipt Issue From Branch")
     source = models.CharField(max_length=255, choices=SOURCE_TYPES, null=True, blank=True, help_text="Transaction Source")
     bank_voucher = models.FileField(
         upload_to='vouchers/',
+        storage=content_addressed_storage,
         blank=True,
         null=True,
         validators=[validate_file_size]
@@ -196,28 +257,184 @@ class BankStatement(models.Model):
     created_date = models.DateTimeField(default=timezone.now, editable=False)
     modified_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, blank=True, null=True)
     last_updated = models.DateTimeField(auto_now=True, editable=False)
+    fingerprint = models.CharField(
+        max_length=64, unique=True, null=True, editable=False,
+        help_text="Hash of the statement line, see statement_fingerprint()",
+    )
 
     def __str__(self):
         return f"{self.bank_code} - {self.policy_no or 'N/A'}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        from .summary import SUMMARY_FIELDS, summary_values
+        obj = super().from_db(db, field_names, values)
+        # What the row adds to DailyStatementSummary as stored, to update it by difference on save
+        if all(field in obj.__dict__ for field in SUMMARY_FIELDS):
+            obj._summary_values = summary_values(obj)
+        # The line as stored, so saves that leave it alone keep the stored fingerprint
+        if all(field in obj.__dict__ for field in FINGERPRINT_FIELDS):
+            obj._fingerprint_values = obj.fingerprint_values()
+        return obj
+
+    def fingerprint_values(self):
+        return tuple(getattr(self, field) for field in FINGERPRINT_FIELDS)
+
+    def fingerprint_changed(self):
+        """
+        Whether the line is new or differs from the stored one. Rows the fingerprint
+        backfill left at NULL, as copies of an earlier line, keep it until then.
+        """
+        stored = getattr(self, '_fingerprint_values', None)
+        return self._state.adding or stored is None or stored != self.fingerprint_values()
+
+    def compute_fingerprint(self):
+        return statement_fingerprint({field: getattr(self, field) for field in FINGERPRINT_FIELDS})
+
+    def clean(self):
+        super().clean()
+        if not self.fingerprint_changed():
+            return
+        duplicates = BankStatement.objects.filter(fingerprint=self.compute_fingerprint()).exclude(pk=self.pk)
+        if duplicates.exists():
+            raise ValidationError("This statement line has already been entered.")
+
+    def save(self, *args, **kwargs):
+        from .policies import sync_policies
+        from .summary import SummaryDelta, stored_summary_values, summary_values
+        update_fields = kwargs.get('update_fields')
+        if self.fingerprint_changed():
+            self.fingerprint = self.compute_fingerprint()
+            if update_fields is not None and set(update_fields) & set(FINGERPRINT_FIELDS):
+                kwargs['update_fields'] = {*update_fields, 'fingerprint'}
+        with transaction.atomic():
+            before = stored_summary_values(self)
+            super().save(*args, **kwargs)
+            if update_fields is None or 'policy_no' in update_fields:
+                sync_policies([(self.pk, self.policy_no)])
+            after = summary_values(self)
+            if update_fields is not None and before is not None:
+                after = {field: after[field] if field in update_fields else value for field, value in before.items()}
+            delta = SummaryDelta()
+            if before is not None:
+                delta.remove(before)
+            delta.add(after)
+            delta.apply()
+        self._summary_values = after
+        if update_fields is None:
+            self._fingerprint_values = self.fingerprint_values()
+
+    def delete(self, *args, **kwargs):
+        from .summary import SummaryDelta, stored_summary_values
+        with transaction.atomic():
+            before = stored_summary_values(self)
+            result = super().delete(*args, **kwargs)
+            if before is not None:
+                delta = SummaryDelta()
+                delta.remove(before)
+                delta.apply()
+        return result
+
 
 
     class Meta:
         verbose_name = "Bank Statement"
         verbose_name_plural = "Bank Statements Reconciliation"
         ordering = ['-created_date']
+        # Access paths of the admin changelist, which orders by -created_date, -id
+        indexes = [
+            models.Index(fields=['created_date', 'id']),
+            models.Index(fields=['branch', 'created_date']),
+            models.Index(fields=['source', 'created_date']),
+            models.Index(fields=['bank_name', 'created_date']),
+            models.Index(fields=['last_updated']),
+            # Keyset pages of the bank statement API filtered by bank
+            models.Index(fields=['bank_code', 'created_date']),
+            # An account's lines in date order, for the running-balance check
+            models.Index(fields=['bank_code', 'bank_account_no', 'bank_deposit_date']),
+        ]
+
+
+
+
+
+class StatementPolicy(models.Model):
+    """
+    One policy number paid by a bank statement, split out of BankStatement.policy_no
+    so a policy is found by exact match on an index (see statement_tracker.policies)
+    """
+    statement = models.ForeignKey(BankStatement, related_name='policies', on_delete=models.CASCADE)
+    policy_no = models.CharField(max_length=50, help_text="Normalized policy number")
+
+    class Meta:
+        verbose_name = "Statement Policy"
+        verbose_name_plural = "Statement Policies"
+        constraints = [
+            # Also the index of the lookups by policy number
+            models.UniqueConstraint(fields=['policy_no', 'statement'], name='unique_statement_policy'),
+        ]
+
+    def __str__(self):
+        return f"{self.policy_no} - statement {self.statement_id}"
+
+
+# Summary date of the statements without a deposit date. NULLs never collide in a
+# unique index, so concurrent writers could each insert their own undated row.
+UNDATED = date(1000, 1, 1)
+
+
+class DailyStatementSummary(models.Model):
+    """
+    BankStatement totals per bank, deposit date, branch and source, kept current on
+    every import, edit and delete (see statement_tracker.summary). Dashboards and
+    month-end reports read these rows instead of the statements.
+    """
+    bank_code = models.CharField(max_length=255)
+    # UNDATED, '' for statements without a deposit date, branch or source, so the unique key has no NULLs
+    bank_deposit_date = models.DateField(help_text="1000-01-01 for statements without a deposit date")
+    branch = models.CharField(max_length=255, blank=True, choices=BankStatement.BRANCH_CHOICES)
+    source = models.CharField(max_length=255, blank=True, choices=BankStatement.SOURCE_TYPES)
+
+    credit_total = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS + 4, decimal_places=AMOUNT_DECIMAL_PLACES, default=0)
+    debit_total = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS + 4, decimal_places=AMOUNT_DECIMAL_PLACES, default=0)
+    row_count = models.PositiveIntegerField(default=0)
+    reconciled_count = models.PositiveIntegerField(default=0, help_text="Statements with a system voucher")
+    reconciled_credit = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS + 4, decimal_places=AMOUNT_DECIMAL_PLACES, default=0,
+                                            help_text="Credit of the statements with a system voucher")
+    # Deposits are the statements with a credit, the ones reconciliation matches to vouchers
+    deposit_count = models.PositiveIntegerField(default=0, help_text="Statements with a credit")
+    reconciled_deposit_count = models.PositiveIntegerField(default=0,
+                                                           help_text="Statements with a credit and a system voucher")
+
+    class Meta:
+        ordering = ['-bank_deposit_date', 'bank_code', 'branch', 'source']
+        verbose_name = "Daily Statement Summary"
+        verbose_name_plural = "Daily Statement Summary"
         constraints = [
-            models.UniqueConstraint(fields=['bank_code', 'balance', 'credit', 'bank_deposit_date'],
-                                    name='unique_bank_statement')
+            models.UniqueConstraint(fields=['bank_code', 'bank_deposit_date', 'branch', 'source'],
+                                    name='unique_daily_statement_summary'),
+        ]
+        indexes = [
+            models.Index(fields=['bank_deposit_date', 'bank_code']),
         ]
 
+    def __str__(self):
+        return f"{self.bank_code} {self.bank_deposit_date} {self.branch or '-'} {self.source or '-'}"
 
+    @property
+    def unreconciled_count(self):
+        """Deposits without a system voucher, as reconciliation.unreconciled_statements() counts them"""
+        return self.deposit_count - self.reconciled_deposit_count
 
+    @property
+    def unreconciled_credit(self):
+        return self.credit_total - self.reconciled_credit
 
 
 class BankStatementChangeHistory(models.Model):
     """
-    Django model to save the log of bank statement changes
+    Django model to save the log of bank statement changes.
+    Full-row copies written before the audit trail; new changes are audit.AuditEntry rows.
     """
     ACTION_CHOICES = [
         ('UPDATE', 'Update'),
@@ -230,12 +447,12 @@ class BankStatementChangeHistory(models.Model):
     bank_name = models.CharField(max_length=255, help_text="Bank name")
     bank_account_no = models.CharField(max_length=255, null=True, help_text="Bank account number")
     bank_deposit_date = models.DateField(null=True, blank=True, help_text="Bank deposit date")
-    balance = models.CharField(max_length=255, null=True, blank=True, help_text="Bank balance")
+    balance = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, null=True, blank=True, help_text="Bank balance")
     bank_transaction_detail = models.CharField(max_length=255, null=True, help_text="Bank transaction detail")
-    debit = models.CharField(max_length=255, null=True, blank=True, help_text="Debit amount")
-    credit = models.CharField(max_length=255, null=True, blank=True, help_text="Credit amount")
+    debit = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, null=True, blank=True, help_text="Debit amount")
+    credit = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, null=True, blank=True, help_text="Credit amount")
     system_voucher_no = models.CharField(max_length=255, blank=True, null=True, help_text="System voucher number")
-    system_amount = models.CharField(max_length=255, null=True, blank=True, help_text="System amount")
+    system_amount = models.DecimalField(max_digits=AMOUNT_MAX_DIGITS, decimal_places=AMOUNT_DECIMAL_PLACES, null=True, blank=True, help_text="System amount")
     policy_no = models.CharField(max_length=500, null=True, help_text="Policy number(s)")
     remarks = models.TextField(blank=True, null=True, help_text="Remarks")
     branch = models.CharField(max_length=255, null=True, blank=True, help_text="Receipt Issue From Branch")
@@ -251,11 +468,85 @@ class BankStatementChangeHistory(models.Model):
         ordering = ['-changed_at']
         verbose_name = "Bank Statement Change History"
         verbose_name_plural = "Bank Statement Change History"
+        indexes = [
+            # Changelist ordering and the archive_history retention cutoff
+            models.Index(fields=['changed_at'], name='bank_history_changed_idx'),
+        ]
 
 
     def __str__(self):
         return f"{self.action} - {self.bank_statement} at {self.changed_at} by {self.changed_by}"
 
+
+class StatementImportJob(models.Model):
+    """
+    Queued bank statement upload, processed by the process_statement_imports command
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    file = models.FileField(upload_to='statement_imports/%Y/%m/', help_text="Uploaded statement file")
+    original_name = models.CharField(max_length=255, blank=True, help_text="Name of the uploaded file")
+    file_sha256 = models.CharField(max_length=64, blank=True, db_index=True, help_text="Hash of the uploaded file")
+    bank_profile = models.CharField(max_length=50, blank=True, help_text="Column layout of the file, blank to detect it")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED', db_index=True)
+
+    rows_parsed = models.PositiveIntegerField(default=0)
+    rows_inserted = models.PositiveIntegerField(default=0)
+    rows_skipped = models.PositiveIntegerField(default=0, help_text="Duplicates of existing statements")
+    rows_failed = models.PositiveIntegerField(default=0, help_text="Rows that could not be parsed")
+    balance_breaks = models.PositiveIntegerField(
+        default=0, help_text="Lines whose balance does not follow from the line before, e.g. after a missing line",
+    )
+    error = models.TextField(blank=True, help_text="Row errors or the reason the job failed")
+    rejects_file = models.FileField(
+        upload_to='statement_imports/rejects/%Y/%m/', blank=True, help_text="CSV of the rows that could not be imported",
+    )
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='statement_import_jobs', on_delete=models.PROTECT)
+    created_date = models.DateTimeField(default=timezone.now, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_updated = models.DateTimeField(auto_now=True, help_text="Refreshed by the worker after every chunk")
+
+    class Meta:
+        ordering = ['-created_date']
+        verbose_name = "Statement Import Job"
+        verbose_name_plural = "Statement Import Jobs"
+
+    def __str__(self):
+        return f"{self.original_name or self.file.name} ({self.get_status_display()})"
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return 0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.rows_parsed / elapsed, 1) if elapsed > 0 else 0
+
+    def progress(self):
+        """Job counters as a JSON serialisable dict"""
+        return {
+            'id': self.pk,
+            'file': self.original_name,
+            'status': self.status,
+            'rows_parsed': self.rows_parsed,
+            'rows_inserted': self.rows_inserted,
+            'rows_skipped': self.rows_skipped,
+            'rows_failed': self.rows_failed,
+            'balance_breaks': self.balance_breaks,
+            'rows_per_second': self.rows_per_second,
+            'error': self.error,
+            'rejects_url': self.rejects_file.url if self.rejects_file else '',
+            'created_date': self.created_date,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
 #
 # # Signals for logging updates and deletes of bank statement change
 # @receiver(pre_save, sender='statement_tracker.BankStatement')
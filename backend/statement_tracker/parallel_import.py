@@ -0,0 +1,133 @@
+"""
+Parallel import of many statement files, e.g. the month-end files of every branch.
+
+Files are decoded, parsed and fingerprinted in a process pool. The calling process is
+the only one that writes: it inserts each file as soon as its worker is done, chunk by
+chunk, so the database sees a single writer however many workers are parsing.
+
+    jobs, duplicates = queue_statement_files(iter_upload_files(upload), user)
+    for summary in run_import_jobs(jobs, workers=4):
+        print(summary)
+"""
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import PurePosixPath
+
+import django
+from django.core.files.base import ContentFile
+from django.db import connections
+
+from .importer import (
+    ImportStats, complete_if_identical, fail_import_job, file_sha256, finish_import_job,
+    insert_statement_rows, iter_statement_rows, job_progress,
+)
+from .models import statement_fingerprint
+
+IMPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+STATEMENT_FILE_EXTENSIONS = ('.csv', '.xlsx')
+
+# Largest statement file accepted from a zip archive, uncompressed
+MAX_ZIP_MEMBER_SIZE = 50 * 1024 * 1024
+
+
+def iter_upload_files(upload):
+    """
+    Yield (name, file) for an uploaded statement file, or for every statement file of
+    an uploaded zip archive. Folders, hidden files and macOS metadata are skipped.
+    """
+    if not upload.name.lower().endswith('.zip'):
+        yield upload.name, upload
+        return
+    with zipfile.ZipFile(upload) as archive:
+        for member in archive.infolist():
+            path = PurePosixPath(member.filename)
+            if member.is_dir() or path.name.startswith('.') or '__MACOSX' in path.parts:
+                continue
+            if path.suffix.lower() not in STATEMENT_FILE_EXTENSIONS:
+                continue
+            if member.file_size > MAX_ZIP_MEMBER_SIZE:
+                raise ValueError(f"{member.filename} is larger than {MAX_ZIP_MEMBER_SIZE // (1024 * 1024)} MB")
+            yield path.name, ContentFile(archive.read(member), name=path.name)
+
+
+class FileImportSummary:
+    """Outcome of one file of a parallel import"""
+
+    def __init__(self, job):
+        self.job = job
+        self.name = job.original_name
+        self.status = 'COMPLETED'
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.error = ''
+        self.parse_seconds = 0.0
+        self.write_seconds = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.status}, {self.created} created, {self.skipped} skipped, {self.failed} failed "
+            f"(parse {self.parse_seconds:.2f}s, write {self.write_seconds:.2f}s)"
+        )
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones already have it
+    django.setup()
+
+
+def parse_statement_file(path, profile=None):
+    """
+    Worker: hash and parse one file. Returns the file hash, the fingerprinted rows,
+    the parse counters and the seconds it took. Never touches the database.
+    """
+    started = time.perf_counter()
+    stats = ImportStats()
+    with open(path, 'rb') as file:
+        sha256 = file_sha256(file)
+        rows = [dict(values, fingerprint=statement_fingerprint(values)) for values in iter_statement_rows(file, stats, profile)]
+    return sha256, rows, stats, time.perf_counter() - started
+
+
+def write_parsed_file(job, future):
+    """Insert the rows a worker parsed for `job` and complete the job"""
+    summary = FileImportSummary(job)
+    started = time.perf_counter()
+    try:
+        sha256, rows, stats, summary.parse_seconds = future.result()
+        if complete_if_identical(job, sha256):
+            summary.status = 'SKIPPED'
+            summary.error = "Identical to an earlier import"
+            return summary
+        insert_statement_rows(rows, job.created_by, stats, on_progress=job_progress(job))
+    except Exception as exc:
+        fail_import_job(job, exc)
+        summary.status, summary.error = 'FAILED', repr(exc)
+        return summary
+    finally:
+        summary.write_seconds = time.perf_counter() - started
+    finish_import_job(job, stats)
+    summary.created, summary.skipped, summary.failed = stats.created, stats.skipped, stats.failed
+    summary.error = '\n'.join(stats.errors)
+    return summary
+
+
+def run_import_jobs(jobs, workers=IMPORT_WORKERS):
+    """
+    Import the files of claimed jobs, parsing them in `workers` processes and inserting
+    them from this one. Returns a FileImportSummary per job, in the order of `jobs`.
+    """
+    if not jobs:
+        return []
+    # Forked workers must not share this process's database connections
+    connections.close_all()
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs))), initializer=_init_worker) as pool:
+        futures = {pool.submit(parse_statement_file, job.file.path, job.bank_profile or None): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            summaries[job.pk] = write_parsed_file(job, future)
+    return [summaries[job.pk] for job in jobs]
@@ -0,0 +1,95 @@
+"""
+Policy numbers of bank statements, one indexed StatementPolicy row per number.
+
+BankStatement.policy_no is free text such as "2156, 2122"; searching it with LIKE
+reads the whole table and also finds 21560. The numbers are split out, normalized
+and kept in StatementPolicy, which is looked up by exact match on its index:
+
+    BankStatement.objects.filter(policy_q('2156'))
+
+The links are synced by BankStatement.save(), the bulk edit, reconciliation and the
+import. Writes that bypass those (QuerySet.update(), raw SQL) are caught up by the
+backfill_statement_policies command.
+"""
+import re
+
+from django.db.models import Q
+
+from .models import BankStatement, StatementPolicy
+
+# Numbers are separated by commas, semicolons or spaces: "2156, 2122", "2156;2122"
+SEPARATOR_PATTERN = re.compile(r'[,;\s]+')
+DIGIT_PATTERN = re.compile(r'\d')
+
+POLICY_NO_MAX_LENGTH = StatementPolicy._meta.get_field('policy_no').max_length
+
+# Statements synced per query
+SYNC_BATCH_SIZE = 500
+
+
+def normalize_policy_no(value):
+    """One policy number as stored in StatementPolicy, '' when it is not one, e.g. "N/A" or too long"""
+    value = value.strip().upper()
+    if not DIGIT_PATTERN.search(value) or len(value) > POLICY_NO_MAX_LENGTH:
+        return ''
+    return value
+
+
+def split_policy_numbers(text):
+    """The distinct normalized policy numbers of a policy_no value, in order"""
+    numbers = (normalize_policy_no(part) for part in SEPARATOR_PATTERN.split(text or ''))
+    return list(dict.fromkeys(number for number in numbers if number))
+
+
+def sync_policies(statements):
+    """
+    Make the StatementPolicy rows of `statements`, (pk, policy_no) pairs, match their
+    policy_no. Returns how many links were added and removed.
+    """
+    added = removed = 0
+    statements = list(statements)
+    for start in range(0, len(statements), SYNC_BATCH_SIZE):
+        wanted = {pk: set(split_policy_numbers(text)) for pk, text in statements[start:start + SYNC_BATCH_SIZE]}
+        stored = {pk: {} for pk in wanted}
+        for link_pk, statement_id, policy_no in StatementPolicy.objects.filter(statement_id__in=wanted).values_list(
+            'pk', 'statement_id', 'policy_no',
+        ):
+            stored[statement_id][policy_no] = link_pk
+        stale = [link_pk for pk, links in stored.items() for policy_no, link_pk in links.items() if policy_no not in wanted[pk]]
+        new = [
+            StatementPolicy(statement_id=pk, policy_no=policy_no)
+            for pk, numbers in wanted.items() for policy_no in sorted(numbers - stored[pk].keys())
+        ]
+        if stale:
+            removed += StatementPolicy.objects.filter(pk__in=stale).delete()[0]
+        if new:
+            StatementPolicy.objects.bulk_create(new, ignore_conflicts=True)
+            added += len(new)
+    return added, removed
+
+
+def backfill_policies(chunk_size=2000):
+    """Sync the links of every statement, reading them in primary key order. Returns (added, removed)."""
+    added = removed = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            BankStatement.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'policy_no')[:chunk_size]
+        )
+        if not rows:
+            return added, removed
+        chunk_added, chunk_removed = sync_policies(rows)
+        added += chunk_added
+        removed += chunk_removed
+        last_pk = rows[-1][0]
+
+
+def policy_q(term):
+    """Q for the statements paying every policy number in `term`, None when it holds none"""
+    numbers = split_policy_numbers(term)
+    if not numbers:
+        return None
+    condition = Q()
+    for number in numbers:
+        condition &= Q(pk__in=StatementPolicy.objects.filter(policy_no=number).values('statement_id'))
+    return condition
@@ -0,0 +1,316 @@
+"""Automatic reconciliation of bank credits against the core system's receipt register"""
+import csv
+import io
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from audit.engine import audit_entry, plain, record
+
+from .importer import parse_amount
+from .models import BankStatement
+from .policies import sync_policies
+from .split_matcher import DEFAULT_MAX_CANDIDATES, DEFAULT_MAX_PARTS, find_combination
+from .summary import SummaryDelta, summary_values
+
+# Columns expected in the receipt register export
+REGISTER_COLUMNS = ('voucher_no', 'amount', 'bank_account_no', 'receipt_date')
+
+UPDATE_BATCH_SIZE = 1000
+
+# Fields reconciliation writes, audited as a diff
+RECONCILED_FIELDS = ('system_voucher_no', 'system_amount', 'policy_no')
+
+
+def normalize_account(account_no):
+    """Account numbers are exported with and without separators, compare only letters and digits"""
+    return re.sub(r'[^0-9A-Za-z]', '', account_no or '').upper()
+
+
+def to_paisa(amount):
+    return int(amount * 100)
+
+
+class AccountIndex:
+    """Interns account numbers to small integers so both sides can be held in integer arrays"""
+
+    def __init__(self):
+        self.ids = {}
+
+    def __call__(self, account_no):
+        return self.ids.setdefault(normalize_account(account_no), len(self.ids))
+
+
+class Receipts:
+    """Receipt register held column-wise in numpy arrays"""
+
+    def __init__(self, voucher_no, amount, account, date, policy_no, line_no):
+        self.voucher_no = voucher_no
+        self.policy_no = policy_no
+        self.line_no = line_no
+        self.amount = np.asarray(amount, dtype=np.int64)
+        self.account = np.asarray(account, dtype=np.int32)
+        self.date = np.asarray(date, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.voucher_no)
+
+
+def load_receipt_register(file, accounts):
+    """Read a receipt register CSV (binary file) into a Receipts object, returns (receipts, errors)"""
+    columns = {'voucher_no': [], 'amount': [], 'account': [], 'date': [], 'policy_no': [], 'line_no': []}
+    errors = []
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        missing = set(REGISTER_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Receipt register is missing columns: {', '.join(sorted(missing))}")
+        for line_no, row in enumerate(reader, start=2):
+            try:
+                amount = parse_amount(row['amount'])
+                date = datetime.strptime(row['receipt_date'].strip(), '%Y-%m-%d').date()
+            except (ValueError, ArithmeticError) as exc:
+                errors.append(f"Line {line_no}: {exc!r}")
+                continue
+            columns['voucher_no'].append(row['voucher_no'].strip())
+            columns['amount'].append(to_paisa(amount))
+            columns['account'].append(accounts(row['bank_account_no']))
+            columns['date'].append(date.toordinal())
+            columns['policy_no'].append((row.get('policy_no') or '').strip())
+            columns['line_no'].append(line_no)
+    finally:
+        text.detach()
+    return Receipts(**columns), errors
+
+
+class Statements:
+    """Unreconciled bank credits held column-wise in numpy arrays"""
+
+    def __init__(self, queryset, accounts):
+        pk, amount, account, date = [], [], [], []
+        rows = queryset.values_list('pk', 'credit', 'bank_account_no', 'bank_deposit_date')
+        for row_pk, credit, account_no, deposit_date in rows.iterator(chunk_size=5000):
+            pk.append(row_pk)
+            amount.append(to_paisa(credit))
+            account.append(accounts(account_no))
+            date.append(deposit_date.toordinal())
+        self.pk = np.asarray(pk, dtype=np.int64)
+        self.amount = np.asarray(amount, dtype=np.int64)
+        self.account = np.asarray(account, dtype=np.int32)
+        self.date = np.asarray(date, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.pk)
+
+
+def unreconciled_statements(date_from=None, date_to=None):
+    """Bank credits without a system voucher"""
+    queryset = BankStatement.objects.filter(
+        credit__gt=0, bank_deposit_date__isnull=False,
+    ).exclude(system_voucher_no__gt='')
+    if date_from:
+        queryset = queryset.filter(bank_deposit_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(bank_deposit_date__lte=date_to)
+    return queryset
+
+
+def hash_join(statements, receipts, date_window):
+    """
+    Match statements to receipts one to one on (account, amount), allowing the dates
+    to differ by up to `date_window` days. Returns a list of (statement index, receipt index).
+
+    The receipts are hashed by key into buckets ordered by date; every statement
+    bisects its bucket to the date window and takes the closest receipt.
+    """
+    buckets = {}
+    for index in np.lexsort((receipts.date, receipts.amount, receipts.account)).tolist():
+        dates, indexes = buckets.setdefault((int(receipts.account[index]), int(receipts.amount[index])), ([], []))
+        dates.append(int(receipts.date[index]))
+        indexes.append(index)
+
+    matches = []
+    # Earliest deposits first, so an early receipt is not taken by a later deposit
+    for index in np.argsort(statements.date, kind='stable').tolist():
+        bucket = buckets.get((int(statements.account[index]), int(statements.amount[index])))
+        if not bucket:
+            continue
+        dates, indexes = bucket
+        deposit_date = int(statements.date[index])
+        best, best_gap = None, None
+        for position in range(bisect_left(dates, deposit_date - date_window),
+                              bisect_right(dates, deposit_date + date_window)):
+            gap = abs(dates[position] - deposit_date)
+            if best_gap is None or gap < best_gap:
+                best, best_gap = position, gap
+        if best is not None:
+            # Matched receipts leave the bucket, so later probes only see unused ones
+            del dates[best]
+            matches.append((index, indexes.pop(best)))
+    return matches
+
+
+def split_join(statements, receipts, date_window, matches, max_parts=DEFAULT_MAX_PARTS,
+               max_candidates=DEFAULT_MAX_CANDIDATES):
+    """
+    Match the credits left over by hash_join to 2 to `max_parts` receipts of the same
+    account within the date window whose amounts add up exactly to the credit.
+    Returns a list of (statement index, [receipt indexes]).
+    """
+    matched_statements = {statement for statement, _ in matches}
+    used = np.zeros(len(receipts), dtype=bool)
+    used[[receipt for _, receipt in matches]] = True
+
+    # Unused receipts per account, ordered by date
+    by_account = {}
+    for index in np.lexsort((receipts.date, receipts.account)).tolist():
+        if not used[index]:
+            dates, indexes = by_account.setdefault(int(receipts.account[index]), ([], []))
+            dates.append(int(receipts.date[index]))
+            indexes.append(index)
+
+    split_matches = []
+    for index in np.argsort(statements.date, kind='stable').tolist():
+        if index in matched_statements or int(statements.account[index]) not in by_account:
+            continue
+        dates, indexes = by_account[int(statements.account[index])]
+        deposit_date = int(statements.date[index])
+        credit = int(statements.amount[index])
+        candidates = [
+            indexes[position]
+            for position in range(bisect_left(dates, deposit_date - date_window),
+                                  bisect_right(dates, deposit_date + date_window))
+            if not used[indexes[position]] and receipts.amount[indexes[position]] < credit
+        ]
+        if len(candidates) > max_candidates:
+            candidates.sort(key=lambda receipt: abs(int(receipts.date[receipt]) - deposit_date))
+            candidates = candidates[:max_candidates]
+
+        found = find_combination(credit, [int(receipts.amount[receipt]) for receipt in candidates], max_parts)
+        if found:
+            parts = [candidates[position] for position in found]
+            used[parts] = True
+            split_matches.append((index, parts))
+    return split_matches
+
+
+class ReconciliationResult:
+    def __init__(self, matches, statements, receipts, errors, split_matches=()):
+        self.matches = matches
+        self.split_matches = list(split_matches)
+        self.statements = statements
+        self.receipts = receipts
+        self.errors = errors
+
+    def receipts_by_statement(self):
+        """Statement primary key -> receipt indexes of every match"""
+        matched = {int(self.statements.pk[statement]): [receipt] for statement, receipt in self.matches}
+        for statement, parts in self.split_matches:
+            matched[int(self.statements.pk[statement])] = parts
+        return matched
+
+    @property
+    def unmatched_statement_pks(self):
+        matched = np.zeros(len(self.statements), dtype=bool)
+        matched[[statement for statement, _ in self.matches]] = True
+        matched[[statement for statement, _ in self.split_matches]] = True
+        return self.statements.pk[~matched].tolist()
+
+    @property
+    def unmatched_receipt_indexes(self):
+        matched = np.zeros(len(self.receipts), dtype=bool)
+        matched[[receipt for _, receipt in self.matches]] = True
+        matched[[receipt for _, parts in self.split_matches for receipt in parts]] = True
+        return np.flatnonzero(~matched).tolist()
+
+
+def apply_matches(result, user):
+    """
+    Write the matched vouchers to BankStatement in one transaction, with one audit entry
+    holding the changed fields per statement. Statements reconciled by hand since they
+    were loaded are left alone. A credit split over several receipts gets their vouchers and policies as comma separated lists.
+    """
+    receipts_for = result.receipts_by_statement()
+    pks = list(receipts_for)
+    now = timezone.now()
+    updated = 0
+    delta = SummaryDelta()
+    with transaction.atomic():
+        for start in range(0, len(pks), UPDATE_BATCH_SIZE):
+            statements = list(
+                BankStatement.objects.select_for_update()
+                .filter(pk__in=pks[start:start + UPDATE_BATCH_SIZE])
+                .exclude(system_voucher_no__gt='')
+            )
+            entries = []
+            for obj in statements:
+                before = {field: plain(getattr(obj, field)) for field in RECONCILED_FIELDS}
+                receipts = receipts_for[obj.pk]
+                obj.system_voucher_no = ', '.join(result.receipts.voucher_no[receipt] for receipt in receipts)
+                obj.system_amount = obj.credit
+                policies = [result.receipts.policy_no[receipt] for receipt in receipts if result.receipts.policy_no[receipt]]
+                if not obj.policy_no and policies:
+                    obj.policy_no = ', '.join(policies)
+                obj.modified_by = user
+                obj.last_updated = now
+                changes = {
+                    field: [before[field], plain(getattr(obj, field))]
+                    for field in RECONCILED_FIELDS if before[field] != plain(getattr(obj, field))
+                }
+                entries.append(audit_entry(obj, 'UPDATE', user, changes, changed_at=now))
+                # The statement now counts as reconciled in its summary row
+                delta.remove(obj._summary_values)
+                delta.add(summary_values(obj))
+            BankStatement.objects.bulk_update(
+                statements, ['system_voucher_no', 'system_amount', 'policy_no', 'modified_by', 'last_updated'],
+            )
+            sync_policies([(obj.pk, obj.policy_no) for obj in statements])
+            record(entries)
+            delta.apply()
+            updated += len(statements)
+    return updated
+
+
+def reconcile(register_file, date_window=3, date_from=None, date_to=None, split_parts=DEFAULT_MAX_PARTS):
+    """
+    Load both sides and match them, nothing is written yet. Credits without a single
+    receipt are then tried against combinations of up to `split_parts` receipts (0 disables).
+    """
+    accounts = AccountIndex()
+    receipts, errors = load_receipt_register(register_file, accounts)
+    statements = Statements(unreconciled_statements(date_from, date_to), accounts)
+    matches = hash_join(statements, receipts, date_window)
+    split_matches = []
+    if split_parts >= 2:
+        split_matches = split_join(statements, receipts, date_window, matches, split_parts)
+    return ReconciliationResult(matches, statements, receipts, errors, split_matches)
+
+
+def write_unmatched_reports(result, statements_file, receipts_file):
+    """Write the unmatched rows of each side as CSV"""
+    writer = csv.writer(statements_file)
+    writer.writerow(['id', 'bank_code', 'bank_account_no', 'bank_deposit_date', 'credit', 'bank_transaction_detail'])
+    pks = result.unmatched_statement_pks
+    for start in range(0, len(pks), UPDATE_BATCH_SIZE):
+        writer.writerows(
+            BankStatement.objects.filter(pk__in=pks[start:start + UPDATE_BATCH_SIZE]).order_by('bank_deposit_date').values_list(
+                'pk', 'bank_code', 'bank_account_no', 'bank_deposit_date', 'credit', 'bank_transaction_detail'
+            )
+        )
+
+    writer = csv.writer(receipts_file)
+    writer.writerow(['line_no', 'voucher_no', 'amount', 'receipt_date', 'policy_no'])
+    receipts = result.receipts
+    for index in result.unmatched_receipt_indexes:
+        writer.writerow([
+            receipts.line_no[index],
+            receipts.voucher_no[index],
+            f"{int(receipts.amount[index]) / 100:.2f}",
+            datetime.fromordinal(int(receipts.date[index])).date(),
+            receipts.policy_no[index],
+        ])
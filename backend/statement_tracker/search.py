@@ -0,0 +1,197 @@
+"""
+Full-text search over bank statements.
+
+SQLite (development) keeps an FTS5 table in sync with BankStatement through triggers,
+MySQL (production) has a FULLTEXT index on the text columns. Both are maintained by
+the database itself, so saves, bulk imports and queryset updates are all indexed.
+Other databases fall back to the admin's icontains search.
+"""
+import re
+from datetime import datetime
+from decimal import InvalidOperation
+
+from django.db import DatabaseError, connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from .importer import parse_amount
+from .models import BankStatement
+from .policies import policy_q
+
+SEARCH_COLUMNS = (
+    'policy_no', 'bank_transaction_detail', 'remarks', 'bank_name',
+    'bank_code', 'bank_account_no', 'system_voucher_no', 'source',
+)
+
+FTS_TABLE = 'statement_tracker_bankstatement_fts'
+MYSQL_FULLTEXT_INDEX = 'bankstatement_fulltext'
+
+# System vouchers look like RP300181820000001
+VOUCHER_PATTERN = re.compile(r'^[A-Za-z]{2,4}\d{6,}$')
+# Bank account numbers: long digit runs, optionally with separators
+ACCOUNT_PATTERN = re.compile(r'^\d[\d-]{7,}\d$')
+
+_available = {}
+
+
+def _table():
+    return BankStatement._meta.db_table
+
+
+def _sqlite_statements():
+    table, columns = _table(), ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{columns}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def _sqlite_triggers(cursor):
+    cursor.execute(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s AND name LIKE %s",
+        [_table(), f'{FTS_TABLE}_%'],
+    )
+    return cursor.fetchone()[0]
+
+
+def ensure_search_index(using='default'):
+    """
+    Create the full-text index if it is missing, returns True when one exists.
+
+    SQLite drops the triggers whenever a migration rebuilds the BankStatement table,
+    so this also runs after every migrate and rebuilds the FTS table when they were gone.
+    """
+    connection = connections[using]
+    _available.pop(using, None)
+    table = _table()
+    if table not in connection.introspection.table_names():
+        return False
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            try:
+                had_triggers = _sqlite_triggers(cursor) == 3
+                for statement in _sqlite_statements():
+                    cursor.execute(statement)
+            except Exception:
+                # SQLite built without FTS5
+                return False
+            if not had_triggers:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            return True
+
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT count(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+                [table, MYSQL_FULLTEXT_INDEX],
+            )
+            if not cursor.fetchone()[0]:
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} ({', '.join(SEARCH_COLUMNS)})"
+                )
+            return True
+    return False
+
+
+def drop_search_index(using='default'):
+    connection = connections[using]
+    _available.pop(using, None)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif connection.vendor == 'mysql':
+            try:
+                cursor.execute(f"ALTER TABLE {_table()} DROP INDEX {MYSQL_FULLTEXT_INDEX}")
+            except DatabaseError:
+                # Not created yet
+                pass
+
+
+def search_available(using='default'):
+    if using not in _available:
+        connection = connections[using]
+        if connection.vendor == 'sqlite':
+            _available[using] = FTS_TABLE in connection.introspection.table_names()
+        else:
+            _available[using] = connection.vendor == 'mysql'
+    return _available[using]
+
+
+def _words(term):
+    return re.findall(r'\w+', term)
+
+
+def fulltext_q(term, using='default'):
+    """
+    Q for rows whose text columns contain every word of `term`, None without words.
+    Words are matched as prefixes, numbers as whole tokens so 2156 does not find 21560.
+    """
+    words = _words(term)
+    if not words:
+        return None
+    if connections[using].vendor == 'mysql':
+        query = ' '.join(f'+{word}' if word.isdigit() else f'+{word}*' for word in words)
+        return Q(RawSQL(f"MATCH ({', '.join(SEARCH_COLUMNS)}) AGAINST (%s IN BOOLEAN MODE)", [query],
+                        output_field=BooleanField()))
+    query = ' '.join(f'"{word}"' if word.isdigit() else f'"{word}"*' for word in words)
+    return Q(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [query]))
+
+
+def exact_match_q(term):
+    """
+    Q for the exact-match fast paths: voucher numbers, account numbers and deposit
+    dates. Returns None when the term is none of those.
+    """
+    term = term.strip()
+    try:
+        return Q(bank_deposit_date=datetime.strptime(term, '%Y-%m-%d').date())
+    except ValueError:
+        pass
+    if VOUCHER_PATTERN.match(term):
+        return Q(system_voucher_no=term.upper())
+    if ACCOUNT_PATTERN.match(term):
+        return Q(bank_account_no=term)
+    return None
+
+
+def amount_q(term):
+    """Q matching the amount columns exactly, None when the term is not an amount"""
+    try:
+        amount = parse_amount(term)
+    except (InvalidOperation, ValueError):
+        return None
+    return Q(credit=amount) | Q(debit=amount) | Q(balance=amount) | Q(system_amount=amount)
+
+
+def search_statements(queryset, term):
+    """
+    Search BankStatement rows. Voucher numbers, account numbers and dates use their
+    indexed columns and only fall back to the text search when nothing matched;
+    numbers are amounts, policy numbers and words, so they use all three.
+    """
+    using = queryset.db
+    exact = exact_match_q(term)
+    if exact is not None:
+        matches = queryset.filter(exact)
+        if matches.exists():
+            return matches
+
+    condition = fulltext_q(term, using)
+    for extra in (amount_q(term), policy_q(term)):
+        if extra is not None:
+            condition = extra if condition is None else condition | extra
+    if condition is None:
+        return queryset.none()
+    return queryset.filter(condition)
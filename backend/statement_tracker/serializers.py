@@ -9,6 +9,7 @@ from rest_framework import serializers
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 
+from .models import BankStatement
 
 User = get_user_model()
 
@@ -174,3 +175,25 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         user.set_password(self.validated_data['new_password'])
         user.save()
         return user
+
+
+## Bank statement API
+class BankStatementSerializer(serializers.ModelSerializer):
+    """Read-only bank statement; pass fields=[...] to return only those fields"""
+
+    class Meta:
+        model = BankStatement
+        fields = (
+            'id', 'bank_code', 'bank_name', 'bank_account_no', 'bank_deposit_date',
+            'bank_transaction_detail', 'debit', 'credit', 'balance',
+            'system_voucher_no', 'system_amount', 'policy_no', 'remarks', 'branch', 'source',
+            'created_by', 'created_date', 'modified_by', 'last_updated',
+        )
+        read_only_fields = fields
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
@@ -0,0 +1,82 @@
+"""Bounded subset-sum search for bank credits that pay several receipts at once"""
+from bisect import bisect_left
+
+# Largest number of receipts one credit is split into
+DEFAULT_MAX_PARTS = 4
+
+# Candidates kept per credit, the ones closest to the deposit date win
+DEFAULT_MAX_CANDIDATES = 300
+
+# Search steps per credit before giving up on it
+DEFAULT_MAX_STEPS = 50000
+
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+
+def find_combination(target, amounts, max_parts=DEFAULT_MAX_PARTS, max_steps=DEFAULT_MAX_STEPS):
+    """
+    Return indexes of 2 to `max_parts` amounts that add up exactly to `target`, or None.
+
+    Amounts are positive integers (paisa). The search is a meet in the middle: a
+    depth first walk over the amounts in descending order picks all but the last two
+    parts, and the last two come from a hash table of pair sums. Branches are cut when
+    the next amount is too big or the largest remaining amounts cannot reach the target,
+    and the walk stops after `max_steps` nodes.
+    """
+    order = sorted((index for index, amount in enumerate(amounts) if 0 < amount < target),
+                   key=lambda index: -amounts[index])
+    values = [amounts[index] for index in order]
+    count = len(values)
+    if count < 2:
+        return None
+
+    # Pair sums by value, a pair stored as positions (i < j) in `values`. The last two
+    # parts must come after the ones already chosen, so each sum keeps its pair with the
+    # latest i: any earlier pair would fail wherever that one fails.
+    pairs = {}
+    for i in range(count - 1, -1, -1):
+        for j in range(count - 1, i, -1):
+            total = values[i] + values[j]
+            if total <= target and total not in pairs:
+                pairs[total] = (i, j)
+
+    # `values` is descending, so reversed it is ascending for bisect
+    ascending = values[::-1]
+    steps = 0
+
+    def finish(remaining, start):
+        # Last two parts, both at positions >= start
+        pair = pairs.get(remaining)
+        if pair and pair[0] >= start:
+            return list(pair)
+        return None
+
+    def walk(remaining, start, parts_left, chosen):
+        nonlocal steps
+        steps += 1
+        if steps > max_steps:
+            raise SearchBudgetExceeded
+        if parts_left >= 2:
+            found = finish(remaining, start)
+            if found:
+                return chosen + found
+        if parts_left <= 2:
+            return None
+        # Skip amounts bigger than what is left: positions before `first` are too big
+        first = max(start, count - bisect_left(ascending, remaining + 1))
+        for position in range(first, count - 2):
+            # The largest amounts still available cannot reach the target: neither can smaller ones
+            if sum(values[position:position + parts_left]) < remaining:
+                break
+            found = walk(remaining - values[position], position + 1, parts_left - 1, chosen + [position])
+            if found:
+                return found
+        return None
+
+    try:
+        found = walk(target, 0, max_parts, [])
+    except SearchBudgetExceeded:
+        return None
+    return [order[position] for position in found] if found else None
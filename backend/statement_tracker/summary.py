@@ -0,0 +1,172 @@
+"""
+Incremental maintenance of DailyStatementSummary.
+
+Every write to BankStatement collects what it takes out of and puts into the summary
+in a SummaryDelta, which is applied in the same transaction with one UPDATE per
+summary row it touches:
+
+    delta = SummaryDelta()
+    delta.remove(statement._summary_values)   # as loaded
+    delta.add(summary_values(statement))      # as saved
+    delta.apply()
+
+Statements without a deposit date are summed under models.UNDATED, and a summary
+row is deleted once its last statement is.
+
+BankStatement.save(), delete() and queryset deletes do this themselves; bulk writes
+(imports, bulk edits, reconciliation) build one delta per batch. rebuild_summaries()
+recomputes the table from the statements; it is needed after writes that bypass the
+deltas, which apply() reports when it finds rows to subtract from missing.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .dashboard import invalidate_widgets
+from .models import AMOUNT_DECIMAL_PLACES, AMOUNT_MAX_DIGITS, UNDATED, BankStatement, DailyStatementSummary
+
+# BankStatement fields a summary row depends on
+SUMMARY_FIELDS = ('bank_code', 'bank_deposit_date', 'branch', 'source', 'credit', 'debit', 'system_voucher_no')
+
+REBUILD_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def summary_values(obj):
+    return {field: getattr(obj, field) for field in SUMMARY_FIELDS}
+
+
+def stored_summary_values(obj):
+    """Summary fields of `obj` as stored, None when it is not saved yet"""
+    if obj._state.adding or obj.pk is None:
+        return None
+    if hasattr(obj, '_summary_values'):
+        return obj._summary_values
+    return BankStatement.objects.filter(pk=obj.pk).values(*SUMMARY_FIELDS).first()
+
+
+def summary_key(values):
+    return values['bank_code'], values['bank_deposit_date'] or UNDATED, values['branch'] or '', values['source'] or ''
+
+
+def is_reconciled(values):
+    # Same test as reconciliation.unreconciled_statements
+    return bool(values['system_voucher_no'])
+
+
+def is_deposit(values):
+    # Only credits are reconciled, see reconciliation.unreconciled_statements
+    return (values['credit'] or 0) > 0
+
+
+class SummaryDelta:
+    """Changes to DailyStatementSummary rows, summed per key until apply()"""
+
+    def __init__(self):
+        self.changes = defaultdict(lambda: [Decimal('0'), Decimal('0'), 0, 0, Decimal('0'), 0, 0])
+
+    def add(self, values, sign=1):
+        change = self.changes[summary_key(values)]
+        change[0] += sign * (values['credit'] or 0)
+        change[1] += sign * (values['debit'] or 0)
+        change[2] += sign
+        if is_reconciled(values):
+            change[3] += sign
+            change[4] += sign * (values['credit'] or 0)
+        if is_deposit(values):
+            change[5] += sign
+            if is_reconciled(values):
+                change[6] += sign
+
+    def remove(self, values):
+        self.add(values, sign=-1)
+
+    def apply(self):
+        applied = False
+        for (bank_code, deposit_date, branch, source), totals in self.changes.items():
+            credit, debit, rows, reconciled, reconciled_credit, deposits, reconciled_deposits = totals
+            if not any(totals):
+                continue
+            applied = True
+            key = dict(bank_code=bank_code, bank_deposit_date=deposit_date, branch=branch, source=source)
+            updates = dict(
+                credit_total=F('credit_total') + credit,
+                debit_total=F('debit_total') + debit,
+                row_count=F('row_count') + rows,
+                reconciled_count=F('reconciled_count') + reconciled,
+                reconciled_credit=F('reconciled_credit') + reconciled_credit,
+                deposit_count=F('deposit_count') + deposits,
+                reconciled_deposit_count=F('reconciled_deposit_count') + reconciled_deposits,
+            )
+            if DailyStatementSummary.objects.filter(**key).update(**updates):
+                if rows < 0:
+                    # The row is locked by the UPDATE until commit, so no writer adds to it meanwhile
+                    DailyStatementSummary.objects.filter(row_count=0, **key).delete()
+                continue
+            if rows <= 0 or min(totals) < 0:
+                # Nothing to subtract from: the statements were written without a delta
+                logger.warning(
+                    "No DailyStatementSummary row for %s %s %s %s to apply %s to, run rebuild_summaries",
+                    bank_code, deposit_date, branch, source, totals,
+                )
+                continue
+            try:
+                with transaction.atomic():
+                    DailyStatementSummary.objects.create(
+                        credit_total=credit, debit_total=debit, row_count=rows, reconciled_count=reconciled,
+                        reconciled_credit=reconciled_credit, deposit_count=deposits,
+                        reconciled_deposit_count=reconciled_deposits, **key,
+                    )
+            except IntegrityError:
+                # Created by a concurrent writer since the UPDATE
+                DailyStatementSummary.objects.filter(**key).update(**updates)
+        self.changes.clear()
+        if applied:
+            invalidate_widgets('unreconciled_statements')
+
+
+def rebuild_summaries():
+    """Recompute DailyStatementSummary from BankStatement with one GROUP BY, returns the row count"""
+    money = DecimalField(max_digits=AMOUNT_MAX_DIGITS + 4, decimal_places=AMOUNT_DECIMAL_PLACES)
+    rows = (
+        BankStatement.objects.order_by()
+        .annotate(date_key=Coalesce('bank_deposit_date', Value(UNDATED)),
+                  branch_key=Coalesce('branch', Value('')), source_key=Coalesce('source', Value('')))
+        .values('bank_code', 'date_key', 'branch_key', 'source_key')
+        .annotate(
+            credit_total=Coalesce(Sum('credit'), Value(Decimal('0')), output_field=money),
+            debit_total=Coalesce(Sum('debit'), Value(Decimal('0')), output_field=money),
+            row_count=Count('id'),
+            reconciled_count=Count('id', filter=Q(system_voucher_no__gt='')),
+            reconciled_credit=Coalesce(Sum('credit', filter=Q(system_voucher_no__gt='')), Value(Decimal('0')),
+                                       output_field=money),
+            deposit_count=Count('id', filter=Q(credit__gt=0)),
+            reconciled_deposit_count=Count('id', filter=Q(credit__gt=0, system_voucher_no__gt='')),
+        )
+    )
+    created = 0
+    with transaction.atomic():
+        DailyStatementSummary.objects.all().delete()
+        batch = []
+        for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch.append(DailyStatementSummary(
+                bank_code=row['bank_code'], bank_deposit_date=row['date_key'],
+                branch=row['branch_key'], source=row['source_key'],
+                credit_total=row['credit_total'], debit_total=row['debit_total'],
+                row_count=row['row_count'], reconciled_count=row['reconciled_count'],
+                reconciled_credit=row['reconciled_credit'], deposit_count=row['deposit_count'],
+                reconciled_deposit_count=row['reconciled_deposit_count'],
+            ))
+            if len(batch) == REBUILD_BATCH_SIZE:
+                DailyStatementSummary.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        DailyStatementSummary.objects.bulk_create(batch)
+        created += len(batch)
+    invalidate_widgets('unreconciled_statements')
+    return created
@@ -1,3 +1,68 @@
-from django.test import TestCase
+import io
+from decimal import Decimal
 
-# Create your tests here.
+import pandas as pd
+from django.test import SimpleTestCase
+
+from .exporter import user_label
+from .importer import ImportStats
+from .split_matcher import find_combination
+from .statement_parser import BankProfile, convert_frame, iter_statement_frames
+
+
+class FindCombinationTests(SimpleTestCase):
+    def assert_split(self, target, amounts, max_parts=4):
+        found = find_combination(target, amounts, max_parts)
+        self.assertIsNotNone(found)
+        self.assertEqual(len(set(found)), len(found))
+        self.assertLessEqual(len(found), max_parts)
+        self.assertEqual(sum(amounts[index] for index in found), target)
+
+    def test_pair(self):
+        self.assert_split(1000, [300, 700, 250])
+
+    def test_repeated_amounts(self):
+        # Many receipts of one premium amount: the pairs after the chosen parts must be found
+        self.assert_split(1600, [600] * 2 + [400] * 20)
+        self.assert_split(1600, [600] * 10 + [400] * 20)
+        self.assert_split(1600, [400] * 30)
+
+    def test_no_combination(self):
+        self.assertIsNone(find_combination(1000, [600, 600, 300]))
+
+
+class StatementParserTests(SimpleTestCase):
+    HEADER = "bank_code,bank_name,bank_account_no,bank_deposit_date,bank_transaction_detail,debit,credit,balance\n"
+
+    def parse(self, text, profile=None):
+        stats = ImportStats()
+        rows = [row for chunk in iter_statement_frames(io.BytesIO(text.encode()), stats, profile) for row in chunk]
+        return rows, stats
+
+    def test_zero_amount_lines_are_imported(self):
+        rows, stats = self.parse(self.HEADER + "NABIL,Nabil Bank,1,2025-01-01,Opening balance,0,0,5000\n")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['balance'], Decimal('5000.00'))
+        self.assertEqual(stats.rejects, [])
+
+    def test_zero_amount_lines_rejected_when_the_profile_asks(self):
+        profile = BankProfile('strict', "Strict", {'bank_code': 'bank_code', 'bank_deposit_date': 'bank_deposit_date',
+                                                   'debit': 'debit', 'credit': 'credit'}, reject_zero_amounts=True)
+        frame = pd.DataFrame({'bank_code': ['NABIL'], 'bank_deposit_date': ['2025-01-01'], 'debit': [0.0], 'credit': [0.0]})
+        parsed, errors = convert_frame(frame, profile)
+        self.assertEqual(len(parsed), 0)
+        self.assertEqual(errors.tolist(), ["neither a debit nor a credit amount"])
+
+    def test_missing_amount_columns_default_to_zero(self):
+        header = "bank_code,bank_name,bank_account_no,bank_deposit_date,bank_transaction_detail,credit\n"
+        rows, stats = self.parse(header + "NABIL,Nabil Bank,1,2025-01-02,Deposit,500\n")
+        self.assertEqual((rows[0]['debit'], rows[0]['credit'], rows[0]['balance']),
+                         (Decimal('0.00'), Decimal('500.00'), Decimal('0.00')))
+
+
+class UserLabelTests(SimpleTestCase):
+    def test_user(self):
+        self.assertEqual(user_label("Ram Sharma", "ram@rjbcl.com.np"), "Ram Sharma-ram@rjbcl.com.np")
+
+    def test_row_without_user(self):
+        self.assertEqual(user_label(None, None), '')
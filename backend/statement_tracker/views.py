@@ -2,8 +2,12 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
 
+from .dashboard import WIDGETS, dashboard_data
+
 
 @api_view(['GET'])
 def api_index(request, format=None):
@@ -22,5 +26,15 @@ def api_index(request, format=None):
 
 
 
+@staff_member_required
 def dashboard(request):
-    return render(request, 'dashboard.html')
+    """Operations dashboard, every widget read from the cache"""
+    return render(request, 'dashboard.html', {'widgets': dashboard_data()})
+
+
+@staff_member_required
+def dashboard_widgets(request, name=None):
+    """Widget data as JSON: all widgets, or the one named in the URL"""
+    if name is not None and name not in WIDGETS:
+        raise Http404(f"No dashboard widget {name}")
+    return JsonResponse({'widgets': dashboard_data([name] if name else None)})
@@ -25,6 +25,13 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from .serializers import PasswordResetRequestSerializer, PasswordResetConfirmSerializer
+from rest_framework.exceptions import ValidationError
+from datetime import datetime, time, timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import BankStatement, StatementPolicy
+from .pagination import CreatedKeysetPagination
+from .policies import split_policy_numbers
+from .serializers import BankStatementSerializer
 
 User = get_user_model()
 
@@ -125,3 +132,102 @@ class PasswordResetConfirmView(APIView):
             serializer.save()
             return Response({"message": "Password has been reset successfully."})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+## Bank statement API
+class ViewModelPermission(permissions.DjangoModelPermissions):
+    """DjangoModelPermissions that also requires the view permission for reads"""
+    perms_map = {
+        **permissions.DjangoModelPermissions.perms_map,
+        'GET': ['%(app_label)s.view_%(model_name)s'],
+        'HEAD': ['%(app_label)s.view_%(model_name)s'],
+        'OPTIONS': ['%(app_label)s.view_%(model_name)s'],
+    }
+
+
+class BankStatementViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only bank statements for incremental pulls, oldest first with keyset pagination.
+
+    Query parameters:
+    - cursor: the `cursor` of the previous response, page_size: up to 5000
+    - created_from / created_to: created_date range (date or ISO datetime, inclusive)
+    - deposit_from / deposit_to: bank_deposit_date range (inclusive)
+    - bank_code, branch, source: exact match, comma separated for several
+    - policy_no: statements paying this policy number, comma separated for any of several
+    - fields: comma separated fields to return, e.g. fields=id,credit,system_voucher_no
+    """
+    serializer_class = BankStatementSerializer
+    pagination_class = CreatedKeysetPagination
+    permission_classes = [IsAuthenticated, ViewModelPermission]
+    queryset = BankStatement.objects.all()
+
+    def get_fields(self):
+        value = self.request.query_params.get('fields')
+        if not value:
+            return None
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(fields) - set(BankStatementSerializer.Meta.fields)
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def parse_bound(self, name):
+        """A date or datetime query parameter, None when absent"""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value) or parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Expected a date (YYYY-MM-DD) or an ISO datetime."})
+        return parsed
+
+    def day_start(self, value):
+        """Datetimes as given, dates as the start of that day, so created_date keeps its index"""
+        if isinstance(value, datetime):
+            return value if timezone.is_aware(value) else timezone.make_aware(value)
+        return timezone.make_aware(datetime.combine(value, time.min))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        for name in ('bank_code', 'branch', 'source'):
+            if params.get(name):
+                queryset = queryset.filter(**{f'{name}__in': params[name].split(',')})
+
+        if params.get('policy_no'):
+            numbers = split_policy_numbers(params['policy_no'])
+            queryset = queryset.filter(pk__in=StatementPolicy.objects.filter(policy_no__in=numbers).values('statement_id'))
+
+        created_from, created_to = self.parse_bound('created_from'), self.parse_bound('created_to')
+        if created_from:
+            queryset = queryset.filter(created_date__gte=self.day_start(created_from))
+        if isinstance(created_to, datetime):
+            queryset = queryset.filter(created_date__lte=self.day_start(created_to))
+        elif created_to:
+            queryset = queryset.filter(created_date__lt=self.day_start(created_to + timedelta(days=1)))
+
+        deposit_from, deposit_to = self.parse_bound('deposit_from'), self.parse_bound('deposit_to')
+        if isinstance(deposit_from, datetime):
+            deposit_from = deposit_from.date()
+        if isinstance(deposit_to, datetime):
+            deposit_to = deposit_to.date()
+        if deposit_from:
+            queryset = queryset.filter(bank_deposit_date__gte=deposit_from)
+        if deposit_to:
+            queryset = queryset.filter(bank_deposit_date__lte=deposit_to)
+
+        fields = self.get_fields()
+        if fields:
+            # The cursor needs created_date even when it is not returned
+            queryset = queryset.only(*{'created_date', *fields})
+        return queryset
+
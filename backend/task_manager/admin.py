@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib import admin
+from rjbcl.admin_export import ExportMixin
 from .models import Task, TaskDiscussion
 from django.contrib.auth import get_user_model
 
@@ -16,7 +17,7 @@ class TaskDiscussionInline(admin.TabularInline):
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(ExportMixin, admin.ModelAdmin):
     # Only show title and description in the form
     fields = ('title', 'deadline', 'status', 'description', 'assigned_to', 'document')
 
@@ -26,6 +27,7 @@ class TaskAdmin(admin.ModelAdmin):
     inlines = [TaskDiscussionInline]
 
     list_display = ('title', 'department', 'status', 'created_by', 'assigned_users')
+    export_prefetch_related = ('assigned_to',)
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket', '0003_alter_ticket_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['current_status', 'sla_due_date'], name='ticket_tick_current_3356dc_idx'),
+        ),
+    ]
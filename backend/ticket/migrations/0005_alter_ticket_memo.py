@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:33
+
+import filestore.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket', '0004_ticket_ticket_tick_current_3356dc_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='memo',
+            field=models.FileField(blank=True, null=True, storage=filestore.storage.content_addressed_storage, upload_to='ticket_memos/'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 import uuid
 from django.conf import settings
+from filestore.storage import content_addressed_storage
 
 
 class Department(models.Model):
@@ -173,7 +174,7 @@ class Ticket(models.Model):
 
     # Memo required
     memo_required = models.BooleanField(default=False)
-    memo = models.FileField(upload_to='ticket_memos/', blank=True, null=True)
+    memo = models.FileField(upload_to='ticket_memos/', storage=content_addressed_storage, blank=True, null=True)
 
 
     is_final = models.BooleanField(default=False)
@@ -297,6 +298,10 @@ class Ticket(models.Model):
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
         ordering = ['-created_at']
+        indexes = [
+            # Overdue tickets: open statuses with a due date in the past
+            models.Index(fields=['current_status', 'sla_due_date']),
+        ]
 
 
 class TicketDiscussion(models.Model):
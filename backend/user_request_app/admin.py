@@ -1,5 +1,6 @@
-import pandas as pd
 from django import forms
+from rjbcl.admin_export import ExportMixin
+from rjbcl.xlsx_reader import iter_sheets
 from django.contrib import admin, messages
 from django.http import HttpResponse
 from django.shortcuts import redirect, render
@@ -34,7 +35,7 @@ class MenuItemAdmin(admin.ModelAdmin):
         return False
 
 
-class UserRequestAdmin(admin.ModelAdmin):
+class UserRequestAdmin(ExportMixin, admin.ModelAdmin):
 
     list_display = [
         'request_name', 'requested_by', 'department',
@@ -42,6 +43,7 @@ class UserRequestAdmin(admin.ModelAdmin):
         'designation', 'request_type', 'status', 'request_date',
 
     ]
+    export_exclude = ['pdf_download_button']
 
     list_filter = [
         'status', 'request_type', 'department', 'request_date', 'requested_by'
@@ -514,11 +516,17 @@ class MenuItemAdmin(admin.ModelAdmin):
         if request.method == "POST":
             form = UploadExcelForm(request.POST, request.FILES)
             if form.is_valid():
-                df = pd.read_excel(request.FILES['excel_file'])
+                sheet = next(iter_sheets(request.FILES['excel_file']), None)
+                if sheet is None or 'name' not in sheet.header:
+                    messages.error(request, "The Excel file must have a 'name' column.")
+                    return redirect(".")
                 created, skipped = 0, 0
-                for _, row in df.iterrows():
-                    name = str(row['name']).strip()
-                    parent_menu = str(row.get('parent_menu', '')).strip()
+                for _, values in sheet.rows:
+                    row = dict(zip(sheet.header, values))
+                    name = str(row['name'] or '').strip()
+                    parent_menu = str(row.get('parent_menu') or '').strip()
+                    if not name:
+                        continue
                     if not MenuItem.objects.filter(name=name).exists():
                         MenuItem.objects.create(name=name, parent_menu=parent_menu)
                         created += 1
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticket', '0004_ticket_ticket_tick_current_3356dc_idx'),
+        ('user_request_app', '0005_alter_useraccessrequest_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userrequest',
+            index=models.Index(fields=['status', 'department'], name='user_reques_status_bc8c4c_idx'),
+        ),
+    ]
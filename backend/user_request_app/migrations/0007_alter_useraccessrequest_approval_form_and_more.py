@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:33
+
+import filestore.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_request_app', '0006_userrequest_user_reques_status_bc8c4c_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='useraccessrequest',
+            name='approval_form',
+            field=models.FileField(blank=True, help_text='Upload scanned approval document', null=True, storage=filestore.storage.content_addressed_storage, upload_to='approval_forms/', verbose_name='Approval Form'),
+        ),
+        migrations.AlterField(
+            model_name='userrequest',
+            name='approval_form',
+            field=models.FileField(blank=True, null=True, storage=filestore.storage.content_addressed_storage, upload_to='isolution/user_request', verbose_name='फारम सबमिट गरेपछि  डाउनलोड गरी हस्ताक्षर गरेर फेरि स्क्यान गरी पुनः यहाँ अपलोड गर्नुहोस्'),
+        ),
+    ]
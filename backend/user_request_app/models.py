@@ -9,6 +9,7 @@ from rjbcl.common_data import (
 
 )
 from ticket.models import  Department
+from filestore.storage import content_addressed_storage
 
 from django.db import models
 from django.contrib.auth import get_user_model
@@ -95,6 +96,7 @@ class UserRequest(models.Model):
     memo_subject = models.CharField(max_length=200, blank=True, null=True)
     approval_form = models.FileField(
         upload_to="isolution/user_request",
+        storage=content_addressed_storage,
         verbose_name="फारम सबमिट गरेपछि  डाउनलोड गरी हस्ताक्षर गरेर फेरि स्क्यान गरी पुनः यहाँ अपलोड गर्नुहोस्",
         blank=True,
         null=True
@@ -113,6 +115,9 @@ class UserRequest(models.Model):
         verbose_name = "User Request"
         verbose_name_plural = "Request -> New Isolution User"
         ordering = ['-request_date']
+        indexes = [
+            models.Index(fields=['status', 'department']),
+        ]
 
 
 
@@ -142,6 +147,7 @@ class UserAccessRequest(models.Model):
     # Approval Document
     approval_form = models.FileField(
         upload_to='approval_forms/',
+        storage=content_addressed_storage,
         verbose_name="Approval Form",
         help_text="Upload scanned approval document",
         blank=True,